@@ -0,0 +1,169 @@
+import json
+import numpy as np
+from mixture import DEFAULT_CHUNK_SIZE, check_modes, draw_mixture_modes, iter_modes, make_rng
+
+
+# On-disk dataset format shared by the Task 1-3 generators and trainers.
+#
+#   magic      8 bytes  b'GMIXDS\x01\x00'
+#   length     8 bytes  little-endian uint64, size of the JSON header in bytes
+#   header     JSON     generation parameters, seed, mode parameters and shapes,
+#                       padded with spaces so the arrays start on a 64-byte boundary
+#   features   float32  (n_samples, n_features), C order
+#   labels     uint8    (n_samples,)
+#
+# load_dataset opens both arrays with np.memmap, so a dataset is generated once
+# and then reused by every run without reading it into memory.
+
+MAGIC = b'GMIXDS\x01\x00'
+
+FEATURE_DTYPE = np.dtype('<f4')
+LABEL_DTYPE = np.dtype('u1')
+
+ALIGNMENT = 64
+
+
+def _write_header(f, header):
+    text = json.dumps(header).encode('utf-8')
+    prefix = len(MAGIC) + 8
+    padding = -(prefix + len(text)) % ALIGNMENT
+    text += b' ' * padding
+    f.write(MAGIC)
+    f.write(np.uint64(len(text)).tobytes())
+    f.write(text)
+    return prefix + len(text)
+
+
+def _create(path, header, n_samples, n_features):
+    # Writes the header, sizes the file and maps the two arrays for writing
+    with open(path, 'wb') as f:
+        offset = _write_header(f, header)
+        labels_offset = offset + n_samples * n_features * FEATURE_DTYPE.itemsize
+        f.truncate(labels_offset + n_samples * LABEL_DTYPE.itemsize)
+
+    if n_samples == 0:
+        return np.empty((0, n_features), FEATURE_DTYPE), np.empty(0, LABEL_DTYPE)
+    X = np.memmap(path, dtype=FEATURE_DTYPE, mode='r+', offset=offset, shape=(n_samples, n_features))
+    y = np.memmap(path, dtype=LABEL_DTYPE, mode='r+', offset=labels_offset, shape=(n_samples,))
+    return X, y
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a dataset file")
+        length = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+        header = json.loads(f.read(length).decode('utf-8'))
+    header['data_offset'] = len(MAGIC) + 8 + length
+    return header
+
+
+def save_dataset(path, X, y, **params):
+    """
+    Save an in-memory dataset. Any extra keyword arguments (seed, modes_per_class,
+    samples_per_mode, ...) are stored in the header next to the array shapes.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    if X.ndim != 2 or len(X) != len(y):
+        raise ValueError("X must have shape (N, D) and y shape (N,).")
+
+    header = dict(params)
+    header.update(n_samples=len(X), n_features=X.shape[1],
+                  class_counts=np.bincount(y.astype(np.intp)).tolist() if len(y) else [])
+    X_out, y_out = _create(path, header, len(X), X.shape[1])
+    X_out[:] = X
+    y_out[:] = y
+    if isinstance(X_out, np.memmap):
+        X_out.flush()
+        y_out.flush()
+
+
+def write_dataset(path, modes_per_class, samples_per_mode, mean_range=(0, 100), variance_range=(0, 100),
+                  full_covariance=False, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generate a Gaussian mixture straight into a dataset file, chunk by chunk.
+
+    When no seed is given a fresh one is drawn and recorded in the header, so
+    every file can be regenerated. Returns the header that was written.
+    """
+    modes_per_class = check_modes(modes_per_class, samples_per_mode)
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    rng = make_rng(seed)
+
+    means, transforms, labels = draw_mixture_modes(rng, modes_per_class, mean_range, variance_range,
+                                                   full_covariance)
+    n_samples = len(means) * samples_per_mode
+    header = {
+        'seed': seed,
+        'modes_per_class': list(modes_per_class),
+        'samples_per_mode': samples_per_mode,
+        'mean_range': list(mean_range),
+        'variance_range': list(variance_range),
+        'full_covariance': full_covariance,
+        'means': means.tolist(),
+        'transforms': transforms.tolist(),
+        'n_samples': n_samples,
+        'n_features': 2,
+        'class_counts': [m * samples_per_mode for m in modes_per_class],
+    }
+
+    X, y = _create(path, header, n_samples, 2)
+    start = 0
+    for chunk in iter_modes(rng, means, transforms, labels, samples_per_mode, chunk_size):
+        stop = start + len(chunk)
+        X[start:stop, 0] = chunk['x']
+        X[start:stop, 1] = chunk['y']
+        y[start:stop] = chunk['label']
+        X.flush()
+        y.flush()
+        start = stop
+
+    return header
+
+
+def load_dataset(path, mode='r'):
+    """
+    Open a dataset without copying it. Returns (X, y, header) where X is a
+    float32 (N, D) memmap and y a uint8 (N,) memmap.
+    """
+    header = read_header(path)
+    n_samples, n_features = header['n_samples'], header['n_features']
+    offset = header['data_offset']
+    labels_offset = offset + n_samples * n_features * FEATURE_DTYPE.itemsize
+
+    if n_samples == 0:
+        return np.empty((0, n_features), FEATURE_DTYPE), np.empty(0, LABEL_DTYPE), header
+    X = np.memmap(path, dtype=FEATURE_DTYPE, mode=mode, offset=offset, shape=(n_samples, n_features))
+    y = np.memmap(path, dtype=LABEL_DTYPE, mode=mode, offset=labels_offset, shape=(n_samples,))
+    return X, y, header
+
+
+def split_classes(X, y):
+    # Class 0 and class 1 points; views into X when the labels are sorted (as
+    # write_dataset produces them), copies otherwise
+    n0 = int(np.count_nonzero(y == 0))
+    if np.all(y[:n0] == 0):
+        return X[:n0], X[n0:]
+    return X[y == 0], X[y == 1]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a Gaussian mixture dataset file.')
+    parser.add_argument('path')
+    parser.add_argument('--modes', type=int, nargs='+', default=[2], help='modes per class (one value or one per class)')
+    parser.add_argument('--samples', type=int, default=100, help='samples per mode')
+    parser.add_argument('--mean-range', type=float, nargs=2, default=(0, 100))
+    parser.add_argument('--variance-range', type=float, nargs=2, default=(0, 100))
+    parser.add_argument('--full-covariance', action='store_true')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    modes = args.modes[0] if len(args.modes) == 1 else args.modes
+    header = write_dataset(args.path, modes, args.samples, args.mean_range, args.variance_range,
+                           args.full_covariance, args.seed, args.chunk_size)
+    print(f"Wrote {header['n_samples']} samples to {args.path} (seed {header['seed']})")
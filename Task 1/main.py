@@ -1,9 +1,10 @@
 import sys
-import numpy as np
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLineEdit, QLabel, QPushButton, QHBoxLayout, QMessageBox, QStatusBar)
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLineEdit, QLabel, QPushButton, QHBoxLayout, QMessageBox, QStatusBar, QFileDialog)
 from PyQt5.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
+from mixture import make_rng, sample_mixture
+from dataset import save_dataset
 
 
 # MatplotlibCanvas Class to integrate Matplotlib with PyQt5
@@ -36,9 +37,16 @@ class MatplotlibCanvas(FigureCanvas):
 
 # Main Window Class
 class DataGeneratorApp(QWidget):
-    def __init__(self):
+    def __init__(self, seed=None):
         super().__init__()
 
+        # Random generator used for the data, a fixed seed makes the runs reproducible
+        self.rng = make_rng(seed)
+
+        # Last generated data and its generation parameters, kept so it can be
+        # saved to a dataset file
+        self.data = None
+
         # Set up the window
         self.setWindowTitle('Gaussian Data Generator')
         self.setGeometry(100, 100, 800, 600)
@@ -79,6 +87,11 @@ class DataGeneratorApp(QWidget):
         layout.addLayout(samples_layout)
         layout.addWidget(self.generate_button)
 
+        # Save button
+        self.save_button = QPushButton('Save Dataset')
+        self.save_button.clicked.connect(self.save_data)
+        layout.addWidget(self.save_button)
+
         # Status Bar
         self.status_bar = QStatusBar()
         layout.addWidget(self.status_bar)
@@ -94,49 +107,52 @@ class DataGeneratorApp(QWidget):
                 raise ValueError("Please enter positive integers.")
 
 
-            # Generate the data
-            data0x = []
-            data0y = []
-            data1x = []
-            data1y = []
-
-
-            modes_per_class = int(self.modes_input.text())
-            samples_per_mode = int(self.samples_input.text())
-
+            # Generate the data (every mode is drawn in one batched call). Every
+            # generation gets its own seed, recorded with the mode parameters so a
+            # saved dataset can be regenerated
+            seed = int(self.rng.integers(2 ** 63))
+            X, y, means, transforms = sample_mixture(modes, samples_per_mode, mean_range=(0, 100),
+                                                     variance_range=(0, 100), seed=seed, return_modes=True)
 
+            self.data = (X, y, {
+                'seed': seed,
+                'modes_per_class': [modes, modes],
+                'samples_per_mode': samples_per_mode,
+                'mean_range': [0, 100],
+                'variance_range': [0, 100],
+                'full_covariance': False,
+                'means': means.tolist(),
+                'transforms': transforms.tolist(),
+            })
 
-            # External loop (2 loops, one for each class)
-            for i in range(2):
-                for j in range(modes_per_class):
-                    
-                    # We calculate a random mean and a random variance for x and y
+            data0x, data0y = X[y == 0, 0], X[y == 0, 1]
+            data1x, data1y = X[y == 1, 0], X[y == 1, 1]
 
-                    mean_x = np.random.uniform(0, 100)
-                    mean_y = np.random.uniform(0, 100)
 
-                    variance_x = np.random.uniform(0, 100)
-                    variance_y = np.random.uniform(0, 100)
+            self.canvas.plot_data(data0x, data0y, data1x, data1y)
 
-                    for k in range(samples_per_mode):
-                        # Creating random coordinate using normal distribution with given mean and variance
-                        x = np.random.normal(loc=mean_x, scale=np.sqrt(variance_x))
-                        y = np.random.normal(loc=mean_y, scale=np.sqrt(variance_y))
 
-                        if (i == 0):
-                            data0x.append(x)
-                            data0y.append(y)
-                        else:
-                            data1x.append(x)
-                            data1y.append(y)
 
+        except ValueError as e:
+            QMessageBox.critical(self, "Input Error", str(e))
 
-            self.canvas.plot_data(data0x, data0y, data1x, data1y)
 
+    # Function to save the last generated data in the dataset format of dataset.py
+    def save_data(self):
+        if self.data is None:
+            QMessageBox.warning(self, "No Data", "Generate some data first.")
+            return
 
+        path, _ = QFileDialog.getSaveFileName(self, "Save Dataset", "dataset.gmix", "Datasets (*.gmix);;All Files (*)")
+        if not path:
+            return
 
-        except ValueError as e:
-            QMessageBox.critical(self, "Input Error", str(e))
+        X, y, params = self.data
+        try:
+            save_dataset(path, X, y, **params)
+            self.status_bar.showMessage(f"Saved {len(X)} samples to {path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Save Error", str(e))
 
 
 # Main function to run the application
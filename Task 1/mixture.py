@@ -0,0 +1,183 @@
+import numpy as np
+
+
+# Headless Gaussian mixture sampler shared by the Task 1, 2 and 3 apps.
+#
+# Every mode is described by a mean (2,) and a linear transform (2, 2) so that
+# a point is mean + z @ transform, with z drawn from a standard normal. With a
+# diagonal transform this is the independent x/y variance used by Tasks 1 and 2,
+# with a full transform it is the A @ A.T covariance used by Task 3.
+
+
+def make_rng(seed=None):
+    # Accepts None, an int seed or an existing np.random.Generator
+    return np.random.default_rng(seed)
+
+
+def draw_modes(rng, n_modes, mean_range=(0, 100), variance_range=(0, 100), full_covariance=False):
+    """
+    Draw the parameters of n_modes Gaussian modes.
+
+    With full_covariance=False every mode gets an independent variance per axis
+    taken from variance_range. With full_covariance=True the entries of a 2x2
+    factor A are taken from variance_range and the covariance is A @ A.T.
+    Returns (means, transforms) with shapes (n_modes, 2) and (n_modes, 2, 2).
+    """
+    means = rng.uniform(mean_range[0], mean_range[1], (n_modes, 2))
+
+    if full_covariance:
+        factors = rng.uniform(variance_range[0], variance_range[1], (n_modes, 2, 2))
+        transforms = np.ascontiguousarray(factors.transpose(0, 2, 1))
+    else:
+        variances = rng.uniform(variance_range[0], variance_range[1], (n_modes, 2))
+        transforms = np.zeros((n_modes, 2, 2))
+        transforms[:, 0, 0] = np.sqrt(variances[:, 0])
+        transforms[:, 1, 1] = np.sqrt(variances[:, 1])
+
+    return means, transforms
+
+
+def sample_modes(rng, means, transforms, samples_per_mode):
+    # One batched normal draw for every mode, returned as a contiguous (N, 2) array
+    z = rng.standard_normal((len(means), samples_per_mode, 2))
+    points = np.matmul(z, transforms)
+    points += means[:, None, :]
+    return points.reshape(-1, 2)
+
+
+def draw_mixture_modes(rng, modes_per_class, mean_range=(0, 100), variance_range=(0, 100), full_covariance=False):
+    # Parameters of every mode of every class, plus the label of each mode
+    means, transforms, labels = [], [], []
+    for label, n_modes in enumerate(modes_per_class):
+        class_means, class_transforms = draw_modes(rng, n_modes, mean_range, variance_range, full_covariance)
+        means.append(class_means)
+        transforms.append(class_transforms)
+        labels.append(np.full(n_modes, label, dtype=np.uint8))
+    return np.concatenate(means), np.concatenate(transforms), np.concatenate(labels)
+
+
+def check_modes(modes_per_class, samples_per_mode):
+    if np.isscalar(modes_per_class):
+        modes_per_class = (modes_per_class, modes_per_class)
+    if any(m <= 0 for m in modes_per_class) or samples_per_mode <= 0:
+        raise ValueError("Please enter positive integers.")
+    return tuple(int(m) for m in modes_per_class)
+
+
+def sample_mixture(modes_per_class, samples_per_mode, mean_range=(0, 100), variance_range=(0, 100),
+                   full_covariance=False, seed=None, return_modes=False):
+    """
+    Sample a labelled Gaussian mixture.
+
+    modes_per_class is either an int (same number of modes for every class, two
+    classes) or a sequence with the number of modes of each class.
+    Returns X with shape (N, 2) as float64 and the labels y with shape (N,) as uint8.
+    With return_modes=True the drawn means and transforms are returned as well,
+    as (X, y, means, transforms).
+    """
+    modes_per_class = check_modes(modes_per_class, samples_per_mode)
+    rng = make_rng(seed)
+
+    means, transforms, labels = draw_mixture_modes(rng, modes_per_class, mean_range, variance_range,
+                                                   full_covariance)
+    X = sample_modes(rng, means, transforms, samples_per_mode)
+    y = np.repeat(labels, samples_per_mode)
+    if return_modes:
+        return X, y, means, transforms
+    return X, y
+
+
+# Streaming mode: the same samples as sample_mixture (for the same seed), but
+# produced in fixed-size chunks so the peak memory does not depend on the
+# number of points requested.
+
+SAMPLE_DTYPE = np.dtype([('x', '<f8'), ('y', '<f8'), ('label', 'u1')])
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def iter_mixture(modes_per_class, samples_per_mode, mean_range=(0, 100), variance_range=(0, 100),
+                 full_covariance=False, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the mixture as structured arrays of SAMPLE_DTYPE (fields x, y, label).
+
+    Every chunk has chunk_size points except the last one. Only the mode
+    parameters and one chunk are kept in memory at any time.
+    """
+    modes_per_class = check_modes(modes_per_class, samples_per_mode)
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+    rng = make_rng(seed)
+
+    means, transforms, labels = draw_mixture_modes(rng, modes_per_class, mean_range, variance_range,
+                                                   full_covariance)
+    return iter_modes(rng, means, transforms, labels, samples_per_mode, chunk_size)
+
+
+def iter_modes(rng, means, transforms, labels, samples_per_mode, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Chunked counterpart of sample_modes, walking the modes in order
+    total = len(means) * samples_per_mode
+    mode, left_in_mode = 0, samples_per_mode
+
+    for start in range(0, total, chunk_size):
+        n = min(chunk_size, total - start)
+        chunk = np.empty(n, dtype=SAMPLE_DTYPE)
+        filled = 0
+        while filled < n:
+            k = min(n - filled, left_in_mode)
+            points = rng.standard_normal((k, 2)) @ transforms[mode]
+            points += means[mode]
+            chunk['x'][filled:filled + k] = points[:, 0]
+            chunk['y'][filled:filled + k] = points[:, 1]
+            chunk['label'][filled:filled + k] = labels[mode]
+            filled += k
+            left_in_mode -= k
+            if left_in_mode == 0:
+                mode, left_in_mode = mode + 1, samples_per_mode
+        yield chunk
+
+
+def write_mixture(path, modes_per_class, samples_per_mode, mean_range=(0, 100), variance_range=(0, 100),
+                  full_covariance=False, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream the mixture straight to disk and return the number of points written.
+
+    A path ending in .npy is written as a memory-mapped .npy file of SAMPLE_DTYPE
+    records, any other path as raw SAMPLE_DTYPE records that can be read back
+    with np.memmap(path, dtype=SAMPLE_DTYPE).
+    """
+    modes_per_class = check_modes(modes_per_class, samples_per_mode)
+    total = sum(modes_per_class) * samples_per_mode
+    chunks = iter_mixture(modes_per_class, samples_per_mode, mean_range, variance_range, full_covariance,
+                          seed, chunk_size)
+
+    if str(path).endswith('.npy'):
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=SAMPLE_DTYPE, shape=(total,))
+        start = 0
+        for chunk in chunks:
+            out[start:start + len(chunk)] = chunk
+            start += len(chunk)
+            # Write the pages back so they do not pile up in memory
+            out.flush()
+        del out
+    else:
+        with open(path, 'wb') as f:
+            for chunk in chunks:
+                chunk.tofile(f)
+
+    return total
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stream a Gaussian mixture dataset to disk.')
+    parser.add_argument('path', help='output file (.npy for a memory-mapped array, anything else for raw records)')
+    parser.add_argument('--modes', type=int, default=2, help='modes per class')
+    parser.add_argument('--samples', type=int, default=100, help='samples per mode')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    n = write_mixture(args.path, args.modes, args.samples, seed=args.seed, chunk_size=args.chunk_size)
+    print(f"Wrote {n} samples to {args.path}")
@@ -1,73 +1,16 @@
+import os
 import sys
 import numpy as np
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLineEdit, QLabel, QPushButton, QHBoxLayout, QMessageBox, QStatusBar)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
+from matplotlib.patches import Polygon
 
-# Define the Neuron class
-class Neuron:
-    def __init__(self, learning_rate=0.01, epochs=2000, activation='heaviside'):
-        self.learning_rate = learning_rate
-        self.epochs = epochs
-        self.activation_name = activation
-        self.weightX = None
-        self.weightY = None
-        self.bias = 0  # Adding a bias term
-
-    # Function that includes all activation functions
-    def activation(self, z):
-        if self.activation_name == 'heaviside':
-            return np.where(z >= 0, 1, 0)
-        elif self.activation_name == 'sigmoid':
-            return 1 / (1 + np.exp(-z))
-        elif self.activation_name == 'sin':
-            return np.sin(z)
-        elif self.activation_name == 'tanh':
-            return np.tanh(z)
-        elif self.activation_name == 'sign':
-            return np.sign(z)
-        elif self.activation_name == 'relu':
-            return np.maximum(0, z)
-        elif self.activation_name == 'leaky_relu':
-            return np.where(z > 0, z, 0.01 * z)
-
-    # Derivative of the activation function
-    def activation_derivative(self, z):
-        if self.activation_name == 'sigmoid':
-            return self.activation(z) * (1 - self.activation(z))
-        elif self.activation_name == 'tanh':
-            return 1 - np.tanh(z) ** 2
-        elif self.activation_name == 'relu':
-            return np.where(z > 0, 1, 0)
-        elif self.activation_name == 'leaky_relu':
-            return np.where(z > 0, 1, 0.01)
-        else:
-            return 1
-
-    # Training function for the Neuron
-    def training(self, data0, data1):
-        self.weightX = np.random.normal(loc=0.0, scale=1)
-        self.weightY = np.random.normal(loc=0.0, scale=1)
-        self.bias = np.random.normal(loc=0.0, scale=1)  # Initialize bias
-
-        for e in range(self.epochs):
-            for i in range(len(data1)):
-                self.train(data0[i][0], data0[i][1], 0)
-                self.train(data1[i][0], data1[i][1], 1)
-
-    def train(self, x, y, true_value):
-        prediction = self.predict(x, y)
-        s = self.weightX * x + self.weightY * y + self.bias
-        derivative = self.activation_derivative(s)
-        aux = self.learning_rate * (true_value - prediction)
-        self.weightX += aux * derivative * x
-        self.weightY += aux * derivative * y
-        self.bias += aux * derivative  # Update bias term
-
-    def predict(self, x, y):
-        z = x * self.weightX + y * self.weightY + self.bias
-        return self.activation(z)
+# The Gaussian mixture sampler lives with the Task 1 data generator
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Task 1'))
+from mixture import make_rng, sample_mixture
+from neuron import Neuron
 
 # MatplotlibCanvas Class to integrate Matplotlib with PyQt5
 class MatplotlibCanvas(FigureCanvas):
@@ -76,16 +19,33 @@ class MatplotlibCanvas(FigureCanvas):
         super().__init__(self.fig)
         self.setParent(parent)
 
+        # Artists of the decision regions and boundary, created once per plot and
+        # then only updated with new vertices
+        self.regions = None
+        self.boundary = None
+
+        # While animating, the regions, boundary and legend are drawn by blitting
+        # on top of a saved background (holding the points) instead of redrawing the figure.
+        # Laying out the legend text is the slowest part of a frame, so its pixels
+        # are saved once per full redraw and pasted back on every frame
+        self.background = None
+        self.legend_pixels = None
+        self.animated_artists = []
+        self.mpl_connect('draw_event', self._on_draw)
+
     def plot_data(self, data0x, data0y, data1x, data1y, neuron=None):
         self.ax.clear()
+        self.regions = None
+        self.boundary = None
+        self.background = None
+        self.legend_pixels = None
+        self.animated_artists = []
         self.ax.scatter(data0x, data0y, color='blue', label='Class 0', alpha=0.6)
         self.ax.scatter(data1x, data1y, color='red', label='Class 1', alpha=0.6)
-        
+
         if neuron and neuron.weightX is not None and neuron.weightY is not None:
-            x_vals = np.array(self.ax.get_xlim())
-            y_vals = -(neuron.weightX * x_vals + neuron.bias) / neuron.weightY  # Adjust for bias
-            self._fill_background(neuron)
-            self.ax.plot(x_vals, y_vals, '--', color="green", label="Decision Boundary")
+            self._fill_background()
+            self.update_boundary(neuron.weightX, neuron.weightY, neuron.bias)
 
         self.ax.set_xlabel("X-axis")
         self.ax.set_ylabel("Y-axis")
@@ -93,25 +53,137 @@ class MatplotlibCanvas(FigureCanvas):
         self.ax.legend()
         self.draw()
 
-    def _fill_background(self, neuron):
+    def _fill_background(self):
+        # The limits are fixed so the region polygons always cover the whole view
+        self.ax.set_xlim(self.ax.get_xlim())
+        self.ax.set_ylim(self.ax.get_ylim())
+
+        # The regions are drawn translucent above the points, so while animating the
+        # points stay in the saved background and only the regions and the line
+        # are redrawn every frame
+        self.regions = (Polygon(np.zeros((3, 2)), closed=True, color='blue', alpha=0.2, linewidth=0),
+                        Polygon(np.zeros((3, 2)), closed=True, color='red', alpha=0.2, linewidth=0))
+        for region in self.regions:
+            region.set_zorder(1.5)
+            region.set_visible(False)
+            self.ax.add_patch(region)
+        self.boundary, = self.ax.plot([], [], '--', color="green", label="Decision Boundary")
+
+    def update_boundary(self, weightX, weightY, bias):
+        # Moves the cached region and boundary artists to the given weights
         x_min, x_max = self.ax.get_xlim()
         y_min, y_max = self.ax.get_ylim()
-        x_min -= 10
-        x_max += 10
-        y_min -= 10
-        y_max += 10
+        negative, positive, line = clip_half_planes(weightX, weightY, bias, x_min, x_max, y_min, y_max)
+
+        for region, vertices in zip(self.regions, (negative, positive)):
+            region.set_visible(len(vertices) >= 3)
+            if len(vertices) >= 3:
+                region.set_xy(vertices)
+
+        self.boundary.set_visible(len(line) >= 2)
+        if len(line) >= 2:
+            self.boundary.set_data([line[0][0], line[-1][0]], [line[0][1], line[-1][1]])
+
+    def start_animation(self):
+        # Adds the (hidden) boundary artists to the current plot and switches them
+        # and the legend above them to blitting
+        if self.regions is None:
+            self._fill_background()
+            self.ax.legend()
+        self.animated_artists = [*self.regions, self.boundary]
+        for artist in self.animated_artists + [self.ax.get_legend()]:
+            artist.set_animated(True)
+        self.draw()
+
+    def animate_boundary(self, weightX, weightY, bias):
+        self.update_boundary(weightX, weightY, bias)
+        if self.background is None:
+            self.draw()
+            return
+        self.restore_region(self.background)
+        self._draw_animated()
+        self.restore_region(self.legend_pixels)
+        self.blit(self.ax.bbox)
+
+    def stop_animation(self):
+        for artist in self.animated_artists + [self.ax.get_legend()]:
+            artist.set_animated(False)
+        self.animated_artists = []
+        self.background = None
+        self.legend_pixels = None
+        self.draw()
+
+    def _on_draw(self, event):
+        # A full redraw (first frame, resize, ...) leaves the animated artists out,
+        # so the background is saved here and the artists are drawn on top of it
+        if not self.animated_artists:
+            return
+        legend = self.ax.get_legend()
+        self.background = self.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+        self.ax.draw_artist(legend)
+        self.legend_pixels = self.copy_from_bbox(legend.get_window_extent())
+
+    def _draw_animated(self):
+        for artist in self.animated_artists:
+            self.ax.draw_artist(artist)
+
+
+# Trains the neuron outside of the GUI thread and reports its weights every
+# snapshot_every epochs, so the boundary can be animated while training runs
+class TrainingWorker(QThread):
+    snapshot = pyqtSignal(float, float, float, int)  # weightX, weightY, bias, epoch
+    finished_training = pyqtSignal(int)  # epochs run
+
+    def __init__(self, neuron, data0, data1, snapshot_every=10, parent=None):
+        super().__init__(parent)
+        self.neuron = neuron
+        self.data0 = data0
+        self.data1 = data1
+        self.snapshot_every = snapshot_every
+
+    def run(self):
+        self.neuron.training(self.data0, self.data1, callback=self._on_epoch)
+        self.finished_training.emit(self.neuron.epochs_run)
+
+    def _on_epoch(self, neuron):
+        if neuron.epochs_run % self.snapshot_every == 0:
+            self.snapshot.emit(float(neuron.weightX), float(neuron.weightY), float(neuron.bias), neuron.epochs_run)
+        return self.isInterruptionRequested()
+
+
+# Splits the box [x_min, x_max] x [y_min, y_max] along the line
+# weightX * x + weightY * y + bias = 0. Returns the vertices of the part where the
+# neuron's input is negative, of the part where it is non-negative, and the points
+# where the line crosses the box edges.
+def clip_half_planes(weightX, weightY, bias, x_min, x_max, y_min, y_max):
+    corners = ((x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max))
+    values = [weightX * x + weightY * y + bias for x, y in corners]
+
+    negative, positive, line = [], [], []
+    for i in range(4):
+        (px, py), p_value = corners[i], values[i]
+        (qx, qy), q_value = corners[(i + 1) % 4], values[(i + 1) % 4]
+
+        (positive if p_value >= 0 else negative).append((px, py))
+        if (p_value >= 0) != (q_value >= 0):
+            t = p_value / (p_value - q_value)
+            crossing = (px + t * (qx - px), py + t * (qy - py))
+            negative.append(crossing)
+            positive.append(crossing)
+            line.append(crossing)
+
+    return negative, positive, line
 
-        x_grid, y_grid = np.meshgrid(np.linspace(x_min, x_max, 500),
-                                     np.linspace(y_min, y_max, 500))
-        
-        z_vals = neuron.weightX * x_grid + neuron.weightY * y_grid + neuron.bias
-        self.ax.contourf(x_grid, y_grid, z_vals, levels=[-np.inf, 0, np.inf], colors=['blue', 'red'], alpha=0.3)
 
 # Main Window Class
 class DataGeneratorApp(QWidget):
-    def __init__(self):
+    def __init__(self, seed=None):
         super().__init__()
 
+        self.rng = make_rng(seed)
+        self.worker = None
+
         self.setWindowTitle('Gaussian Data Generator with Neuron')
         self.setGeometry(100, 100, 800, 600)
         self.setStyleSheet("background-color: #f0f0f0;")
@@ -158,37 +230,46 @@ class DataGeneratorApp(QWidget):
             if modes_per_class <= 0 or samples_per_mode <= 0:
                 raise ValueError("Please enter positive integers.")
 
-            data0x, data0y, data1x, data1y = [], [], [], []
-
-            for i in range(2):
-                for j in range(modes_per_class):
-                    mean_x = np.random.uniform(0, 100)
-                    mean_y = np.random.uniform(0, 100)
-                    variance_x = np.random.uniform(0, 100)
-                    variance_y = np.random.uniform(0, 100)
+            X, y = sample_mixture(modes_per_class, samples_per_mode, mean_range=(0, 100),
+                                  variance_range=(0, 100), seed=self.rng)
 
-                    for _ in range(samples_per_mode):
-                        x = np.random.normal(loc=mean_x, scale=np.sqrt(variance_x))
-                        y = np.random.normal(loc=mean_y, scale=np.sqrt(variance_y))
+            data0 = X[y == 0]
+            data1 = X[y == 1]
+            data0x, data0y = data0[:, 0], data0[:, 1]
+            data1x, data1y = data1[:, 0], data1[:, 1]
 
-                        if i == 0:
-                            data0x.append(x)
-                            data0y.append(y)
-                        else:
-                            data1x.append(x)
-                            data1y.append(y)
+            self.canvas.plot_data(data0x, data0y, data1x, data1y)
+            self.canvas.start_animation()
 
-            data0 = [[x, y] for x, y in zip(data0x, data0y)]
-            data1 = [[x, y] for x, y in zip(data1x, data1y)]
-
-            neuron = Neuron(learning_rate=0.1, epochs=2000, activation='heaviside')
-            neuron.training(data0, data1)
-
-            self.canvas.plot_data(data0x, data0y, data1x, data1y, neuron=neuron)
+            neuron = Neuron(learning_rate=0.1, epochs=2000, activation='heaviside', batch_size=32, patience=100,
+                            seed=self.rng)
+            self.worker = TrainingWorker(neuron, data0, data1, snapshot_every=10, parent=self)
+            self.worker.snapshot.connect(self.show_snapshot)
+            self.worker.finished_training.connect(self.training_finished)
+            self.generate_button.setEnabled(False)
+            self.status_bar.showMessage("Training...")
+            self.worker.start()
 
         except ValueError as e:
             QMessageBox.critical(self, "Input Error", str(e))
 
+    def show_snapshot(self, weightX, weightY, bias, epoch):
+        self.canvas.animate_boundary(weightX, weightY, bias)
+        self.status_bar.showMessage(f"Training... epoch {epoch}")
+
+    def training_finished(self, epochs_run):
+        neuron = self.worker.neuron
+        self.canvas.update_boundary(neuron.weightX, neuron.weightY, neuron.bias)
+        self.canvas.stop_animation()
+        self.generate_button.setEnabled(True)
+        self.status_bar.showMessage(f"Trained for {epochs_run} epochs")
+
+    def closeEvent(self, event):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.worker.wait()
+        super().closeEvent(event)
+
 def main():
     app = QApplication(sys.argv)
     main_window = DataGeneratorApp()
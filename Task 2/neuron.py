@@ -0,0 +1,247 @@
+import numpy as np
+
+# Define the Neuron class
+class Neuron:
+    def __init__(self, learning_rate=0.01, epochs=2000, activation='heaviside', batch_size=None,
+                 patience=None, tol=1e-4, shuffle=False, seed=None):
+        self.learning_rate = learning_rate
+        self.epochs = epochs
+        self.activation_name = activation
+        # None trains online (one update per point), an int trains on mini-batches
+        # of that size and a batch_size >= the number of points is full-batch training
+        self.batch_size = batch_size
+        # Training stops early after an epoch without errors (nothing would change
+        # anymore) or, when patience is set, once the epoch loss has not improved
+        # by more than tol for patience epochs in a row. Stopping on patience puts
+        # back the weights of the epoch with the best loss
+        self.patience = patience
+        self.tol = tol
+        # With shuffle the points are visited in a new seeded permutation every epoch
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.epochs_run = 0
+        self.loss_history = []
+        self.weights = None  # One weight per feature, [weightX, weightY] for 2-D points
+        self.bias = 0  # Adding a bias term
+
+    @property
+    def weightX(self):
+        return None if self.weights is None else self.weights[0]
+
+    @weightX.setter
+    def weightX(self, value):
+        self._check_weights()
+        self.weights[0] = value
+
+    @property
+    def weightY(self):
+        return None if self.weights is None else self.weights[1]
+
+    @weightY.setter
+    def weightY(self, value):
+        self._check_weights()
+        self.weights[1] = value
+
+    def _check_weights(self):
+        if self.weights is None:
+            raise ValueError("The weights are not initialized, call init_weights or train the neuron first.")
+
+    # Function that includes all activation functions
+    def activation(self, z):
+        if self.activation_name == 'heaviside':
+            return np.where(z >= 0, 1, 0)
+        elif self.activation_name == 'sigmoid':
+            return 1 / (1 + np.exp(-z))
+        elif self.activation_name == 'sin':
+            return np.sin(z)
+        elif self.activation_name == 'tanh':
+            return np.tanh(z)
+        elif self.activation_name == 'sign':
+            return np.sign(z)
+        elif self.activation_name == 'relu':
+            return np.maximum(0, z)
+        elif self.activation_name == 'leaky_relu':
+            return np.where(z > 0, z, 0.01 * z)
+
+    # Derivative of the activation function
+    def activation_derivative(self, z):
+        if self.activation_name == 'sigmoid':
+            s = self.activation(z)
+            return s * (1 - s)
+        elif self.activation_name == 'tanh':
+            return 1 - np.tanh(z) ** 2
+        elif self.activation_name == 'relu':
+            return np.where(z > 0, 1, 0)
+        elif self.activation_name == 'leaky_relu':
+            return np.where(z > 0, 1, 0.01)
+        else:
+            return 1
+
+    def init_weights(self, n_features=2):
+        self.weights = self.rng.normal(loc=0.0, scale=1, size=n_features)
+        self.bias = self.rng.normal(loc=0.0, scale=1)  # Initialize bias
+
+        self.epochs_run = 0
+        self.loss_history = []
+        self._best_loss = np.inf
+        self._best_weights = self.weights.copy()
+        self._best_bias = self.bias
+        self._epochs_without_improvement = 0
+
+    # Records the epoch and tells whether training can stop. errors is the number
+    # of points whose prediction differed from the label during the epoch, loss the
+    # mean squared error (of the weights at the end of the epoch when patience is set)
+    def end_epoch(self, errors, loss):
+        self.epochs_run += 1
+        self.loss_history.append(loss)
+
+        if errors == 0:
+            return True
+        if self.patience is None:
+            return False
+
+        if loss < self._best_loss - self.tol:
+            self._best_loss = loss
+            self._best_weights[:] = self.weights
+            self._best_bias = self.bias
+            self._epochs_without_improvement = 0
+        else:
+            self._epochs_without_improvement += 1
+        if self._epochs_without_improvement < self.patience:
+            return False
+
+        # The loss of a neuron that cannot separate the data jumps around, so the
+        # last epoch is not better than any other one
+        self.weights[:] = self._best_weights
+        self.bias = self._best_bias
+        return True
+
+    # Training function for the Neuron: the class 0 and class 1 points are used
+    # as one dataset, visited alternating between the classes (the extra points of
+    # the bigger class go at the end)
+    def training(self, data0, data1, callback=None):
+        X = np.concatenate((data0, data1))
+        y = np.repeat(np.array([0, 1], dtype=np.uint8), (len(data0), len(data1)))
+        self.fit(X, y, callback, order=interleave_order(y))
+
+    # Training on a feature matrix X with shape (N, D) and labels y with shape (N,).
+    # Mini-batch updates are the mean of the online updates over the batch, so
+    # batch_size=1 matches the online rule up to floating point rounding.
+    # order is the sequence of row indices visited every epoch (row order by
+    # default), with shuffle it is permuted anew every epoch. X and y are only
+    # ever indexed one batch at a time, so memory-mapped data is not copied.
+    # callback(neuron) is called after every epoch, returning True stops training
+    def fit(self, X, y, callback=None, order=None):
+        X = np.asarray(X)
+        y = np.asarray(y)
+        n, n_features = X.shape
+
+        self.init_weights(n_features)
+        batch_size = self.batch_size or 1
+        base_order = order
+
+        for e in range(self.epochs):
+            if self.shuffle:
+                order = self.rng.permutation(n)
+                if base_order is not None:
+                    order = base_order[order]
+
+            errors, squared_error = 0, 0.0
+            if self.batch_size is None:
+                for i in (range(n) if order is None else order):
+                    error = self.train_point(X[i], y[i])
+                    if error != 0:
+                        errors += 1
+                        squared_error += error * error
+            else:
+                for start in range(0, n, batch_size):
+                    batch = slice(start, start + batch_size) if order is None else order[start:start + batch_size]
+                    X_batch = X[batch]
+                    z = X_batch @ self.weights + self.bias
+                    error = y[batch] - self.activation(z)
+                    delta = self.learning_rate * error * self.activation_derivative(z)
+                    self.weights += (delta @ X_batch) / len(X_batch)
+                    self.bias += np.mean(delta)
+
+                    errors += np.count_nonzero(error)
+                    squared_error += error @ error
+
+            loss = squared_error / n if self.patience is None else self.loss(X, y)
+            stop = self.end_epoch(errors, loss)
+            if callback is not None and callback(self):
+                stop = True
+            if stop:
+                break
+
+    # Training on a dataset file written by dataset.py, the points are read
+    # straight from the memory-mapped file instead of being loaded first. Task 1
+    # has to be on sys.path, as the Task 2 entry points set it up
+    def training_file(self, path):
+        from dataset import load_dataset
+
+        X, y, _ = load_dataset(path)
+        self.fit(X, y, order=interleave_order(y))
+
+    # Online update for a 2-D point (x, y), see train_point
+    def train(self, x, y, true_value):
+        return self.train_point(np.array([x, y]), true_value)
+
+    # Online update for one point with shape (D,), returns the error
+    def train_point(self, point, true_value):
+        self._check_weights()
+        # Sum of the products rather than a dot product, which may fuse the
+        # multiply-adds and round differently from the per-coordinate 2-D rule
+        z = (point * self.weights).sum() + self.bias
+        error = true_value - self.activation(z)
+        aux = self.learning_rate * error * self.activation_derivative(z)
+        self.weights += aux * point
+        self.bias += aux  # Update bias term
+        return error
+
+    def predict(self, x, y):
+        self._check_weights()
+        z = x * self.weightX + y * self.weightY + self.bias
+        return self.activation(z)
+
+    # Activation for every row of X with shape (N, D)
+    def predict_batch(self, X):
+        return self.activation(np.asarray(X) @ self.weights + self.bias)
+
+    # Mean squared error of the current weights over all the points, evaluated in
+    # chunks so memory-mapped data is not read in at once
+    def loss(self, X, y, chunk_size=65536):
+        total = 0.0
+        for start in range(0, len(X), chunk_size):
+            error = y[start:start + chunk_size] - self.predict_batch(X[start:start + chunk_size])
+            total += error @ error
+        return float(total) / len(X)
+
+    # Fraction of the points whose output is on the side (above or below 0.5) of their label
+    def accuracy(self, X, y):
+        predicted = self.predict_batch(X) >= 0.5
+        return float(np.mean(predicted == (np.asarray(y) == 1)))
+
+
+# Row indices of a two-class dataset alternating between the classes while both
+# have points left, followed by the rest of the bigger class
+def interleave_order(y):
+    y = np.asarray(y)
+    n0 = int(np.count_nonzero(y == 0))
+    n = min(n0, len(y) - n0)
+
+    if not np.all(y[:n0] == 0):
+        index0, index1 = np.flatnonzero(y == 0), np.flatnonzero(y != 0)
+        order = np.empty(len(y), dtype=np.intp)
+        order[0:2 * n:2] = index0[:n]
+        order[1:2 * n:2] = index1[:n]
+        order[2 * n:] = index0[n:] if len(index0) > n else index1[n:]
+        return order
+
+    # Sorted labels (as dataset files have them): the order is built in place from
+    # the row numbers, position p < 2n holds row p // 2 of its class
+    order = np.arange(len(y))
+    order[:2 * n] >>= 1
+    order[1:2 * n:2] += n0
+    if n0 > n:
+        order[2 * n:] -= n
+    return order
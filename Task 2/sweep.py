@@ -0,0 +1,125 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from neuron import Neuron
+
+
+# Hyperparameter sweeps for the Neuron, every (learning_rate, activation, seed)
+# configuration is trained in a separate process. The training data is copied
+# once into shared memory and every worker maps it instead of receiving a
+# pickled copy with each configuration.
+
+# Set in every worker by _init_worker
+_shared = {}
+
+
+def _init_worker(X_name, X_shape, X_dtype, y_name, y_shape, y_dtype, neuron_kwargs):
+    # The pool workers share the resource tracker of the parent, which unlinks the blocks
+    X_shm, y_shm = shared_memory.SharedMemory(name=X_name), shared_memory.SharedMemory(name=y_name)
+    _shared['blocks'] = (X_shm, y_shm)
+    _shared['X'] = np.ndarray(X_shape, dtype=X_dtype, buffer=X_shm.buf)
+    _shared['y'] = np.ndarray(y_shape, dtype=y_dtype, buffer=y_shm.buf)
+    _shared['neuron_kwargs'] = neuron_kwargs
+
+
+def _run(config):
+    learning_rate, activation, seed = config
+    X, y = _shared['X'], _shared['y']
+
+    neuron = Neuron(learning_rate=learning_rate, activation=activation, seed=seed, **_shared['neuron_kwargs'])
+    start = time.perf_counter()
+    neuron.fit(X, y)
+    wall_time = time.perf_counter() - start
+
+    return {
+        'learning_rate': learning_rate,
+        'activation': activation,
+        'seed': seed,
+        'weights': neuron.weights.tolist(),
+        'bias': float(neuron.bias),
+        'accuracy': neuron.accuracy(X, y),
+        'epochs_run': neuron.epochs_run,
+        'wall_time': wall_time,
+    }
+
+
+def _to_shared(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm
+
+
+def sweep(X, y, learning_rates, activations, seeds, workers=None, **neuron_kwargs):
+    """
+    Train a Neuron for every combination of learning_rates x activations x seeds
+    on X (N, D) and y (N,), using a pool of `workers` processes (all cores by
+    default). Any other keyword argument (epochs, batch_size, patience, ...) is
+    passed to every Neuron; shuffle defaults to True since the data is usually
+    sorted by class.
+
+    Returns one dict per configuration, in the order of the configurations, with
+    the final weights, bias, accuracy, epochs run and training wall time.
+    """
+    X = np.ascontiguousarray(X)
+    y = np.ascontiguousarray(y)
+    neuron_kwargs.setdefault('shuffle', True)
+    neuron_kwargs.setdefault('batch_size', 32)
+    configs = list(itertools.product(learning_rates, activations, seeds))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    X_shm, y_shm = _to_shared(X), _to_shared(y)
+    try:
+        init_args = (X_shm.name, X.shape, X.dtype, y_shm.name, y.shape, y.dtype, neuron_kwargs)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+            return list(pool.map(_run, configs))
+    finally:
+        X_shm.close()
+        X_shm.unlink()
+        y_shm.close()
+        y_shm.unlink()
+
+
+def format_table(rows):
+    lines = [f"{'lr':>8} {'activation':>11} {'seed':>6} {'accuracy':>9} {'epochs':>7} {'time [s]':>9}  weights, bias"]
+    for row in rows:
+        weights = ', '.join(f"{w:.3f}" for w in row['weights'])
+        lines.append(f"{row['learning_rate']:>8g} {row['activation']:>11} {row['seed']!s:>6} {row['accuracy']:>9.3f} "
+                     f"{row['epochs_run']:>7} {row['wall_time']:>9.3f}  [{weights}], {row['bias']:.3f}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    # The mixture sampler and the dataset format live with the Task 1 data generator
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Task 1'))
+    from mixture import sample_mixture
+    from dataset import load_dataset
+
+    parser = argparse.ArgumentParser(description='Parallel hyperparameter sweep of the Task 2 neuron.')
+    parser.add_argument('--dataset', help='dataset file written by dataset.py (generated data otherwise)')
+    parser.add_argument('--modes', type=int, default=2, help='modes per class of the generated data')
+    parser.add_argument('--samples', type=int, default=1000, help='samples per mode of the generated data')
+    parser.add_argument('--learning-rates', type=float, nargs='+', default=[0.001, 0.01, 0.1])
+    parser.add_argument('--activations', nargs='+', default=['heaviside', 'sigmoid', 'tanh', 'relu'])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--epochs', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.dataset:
+        X, y, _ = load_dataset(args.dataset)
+    else:
+        X, y = sample_mixture(args.modes, args.samples, seed=0)
+
+    start = time.perf_counter()
+    rows = sweep(X, y, args.learning_rates, args.activations, args.seeds, workers=args.workers,
+                 epochs=args.epochs, batch_size=args.batch_size)
+    print(format_table(rows))
+    print(f"{len(rows)} configurations in {time.perf_counter() - start:.2f} s")
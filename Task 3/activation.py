@@ -1,25 +1,78 @@
 import numpy as np
 
 class ActivationLayer:
-    def __init__(self, activation):
+    def __init__(self, activation, dtype=np.float64):
         self.activation = activation
-        self.activation_func, self.activation_derivative = self.get_activation_functions(activation)
+        self.dtype = np.dtype(dtype)
+        self.activation_func, self.activation_derivative = self.get_activation_functions(activation, self.dtype)
+
+        # Preallocated (output, input error) buffers per batch size, see allocate
+        self.workspaces = {}
+
+    def allocate(self, batch_size, features):
+        if batch_size not in self.workspaces:
+            self.workspaces[batch_size] = (np.empty((features, batch_size), dtype=self.dtype),
+                                           np.empty((features, batch_size), dtype=self.dtype))
 
     def forward(self, input_data):
         self.input = input_data
-        self.output = self.activation_func(self.input)
+        workspace = self.workspaces.get(input_data.shape[1])
+        self.output = self.activation_func(self.input, None if workspace is None else workspace[0])
         return self.output
 
     def backward(self, output_error):
-        return output_error * self.activation_derivative(self.output)
+        workspace = self.workspaces.get(output_error.shape[1])
+        error = self.activation_derivative(self.output, None if workspace is None else workspace[1])
+        error *= output_error
+        return error
 
+    # Returns f(x, out) and f'(y, out), with f' written in terms of the output y = f(x).
+    # Both write into out when it is given and allocate a single array otherwise
     @staticmethod
-    def get_activation_functions(name):
+    def get_activation_functions(name, dtype=np.float64):
         if name == 'sigmoid':
-            return lambda x: 1 / (1 + np.exp(-x)), lambda y: y * (1 - y)
+            return sigmoid, lambda y, out=None: np.multiply(y, np.subtract(1, y, out=out), out=out)
         elif name == 'tanh':
-            return np.tanh, lambda y: 1 - y ** 2
+            return (lambda x, out=None: np.tanh(x, out=out),
+                    lambda y, out=None: np.subtract(1, np.multiply(y, y, out=out), out=out))
         elif name == 'relu':
-            return lambda x: np.maximum(0, x), lambda y: np.where(y > 0, 1, 0)
+            # y >= 0, so sign(y) is the 0/1 derivative without casting a boolean
+            # array into out (which makes numpy allocate a buffer)
+            return (lambda x, out=None: np.maximum(x, 0, out=out),
+                    lambda y, out=None: np.sign(y, out=out) if out is not None else (y > 0).astype(y.dtype))
+        elif name == 'softmax':
+            # Only used as output layer with the cross-entropy loss, whose gradient
+            # (output - target) is already the gradient with respect to the softmax input
+            return softmax, softmax_derivative
         else:
             raise ValueError("Unsupported activation function")
+
+
+def sigmoid(x, out=None):
+    # 1 / (1 + exp(-x)) computed in place. -x is clamped to the largest value whose
+    # exp is finite in the array's dtype (88 in float32, 709 in float64), which
+    # avoids the overflow warnings without changing the result
+    out = np.negative(x, out=out)
+    np.minimum(out, np.floor(np.log(np.finfo(out.dtype).max)), out=out)
+    np.exp(out, out=out)
+    out += 1
+    return np.divide(1, out, out=out)
+
+
+def softmax_derivative(y, out=None):
+    # Ones, so backward passes the output error through unchanged
+    if out is None:
+        return np.ones_like(y)
+    out.fill(1)
+    return out
+
+
+def softmax(x, out=None, scratch=None):
+    # Column-wise softmax, shifted by the column maximum so exp cannot overflow.
+    # scratch is an optional (1, batch) buffer for the column maxima and sums
+    scratch = np.max(x, axis=0, keepdims=True, out=scratch)
+    out = np.subtract(x, scratch, out=out)
+    np.exp(out, out=out)
+    np.sum(out, axis=0, keepdims=True, out=scratch)
+    out /= scratch
+    return out
@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from neural_network import SimpleNeuralNet
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Task 1'))
+from mixture import sample_mixture
+
+
+# Training throughput and accuracy of the network in float64 and float32, on the
+# same Task 3 data (Gaussian modes with means in [-1, 1] and A @ A.T covariances)
+# and from the same initial weights.
+
+def run(dtype, X, y, args):
+    np.random.seed(args.seed)
+    model = SimpleNeuralNet(2, args.neurons, args.layers, args.activation, lr=args.lr, iterations=args.iterations,
+                            batch_size=args.batch_size, shuffle=True, seed=args.seed, optimizer=args.optimizer,
+                            dtype=dtype)
+    start = time.perf_counter()
+    model.train(X, y)
+    elapsed = time.perf_counter() - start
+    accuracy = np.mean(model.predict_batch(X) == y)
+    return len(X) * args.iterations / elapsed, accuracy
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare float64 and float32 training of the Task 3 network.')
+    parser.add_argument('--modes', type=int, default=2, help='modes per class')
+    parser.add_argument('--samples', type=int, default=5000, help='samples per mode')
+    parser.add_argument('--layers', type=int, default=2, help='hidden layers')
+    parser.add_argument('--neurons', type=int, default=256, help='neurons per hidden layer')
+    parser.add_argument('--activation', default='sigmoid', choices=['sigmoid', 'tanh', 'relu'])
+    parser.add_argument('--optimizer', default='adam', choices=['sgd', 'momentum', 'rmsprop', 'adam'])
+    parser.add_argument('--lr', type=float, default=0.0005)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    X, y = sample_mixture(args.modes, args.samples, mean_range=(-1, 1), variance_range=(0.1, 0.5),
+                          full_covariance=True, seed=args.seed)
+
+    results = {}
+    for dtype in (np.float64, np.float32):
+        results[dtype] = run(dtype, X, y, args)
+        throughput, accuracy = results[dtype]
+        print(f"{np.dtype(dtype).name:>8}: {throughput:12,.0f} samples/s  accuracy {accuracy:.4f}")
+
+    (throughput64, accuracy64), (throughput32, accuracy32) = results[np.float64], results[np.float32]
+    print(f"float32 speedup {throughput32 / throughput64:.2f}x, accuracy difference {accuracy32 - accuracy64:+.4f}")
@@ -0,0 +1,129 @@
+import itertools
+import os
+import sys
+import time
+import numpy as np
+from neural_network import SimpleNeuralNet
+from telemetry import Telemetry
+
+# The dataset format and the mixture sampler live with the Task 1 data generator
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Task 1'))
+from dataset import MAGIC, load_dataset
+
+
+# Headless entry point for the Task 3 network: trains on a dataset file and
+# classifies points in streaming chunks, without importing tkinter or matplotlib.
+#
+#   python cli.py train data.gmix model.snn --neurons 8 --layers 2 [--telemetry run.csv]
+#   python cli.py predict model.snn < points.txt > labels.txt
+#
+# Points are read either from a dataset file (memory-mapped) or as text, one
+# point per line with the coordinates separated by spaces or commas. The labels
+# are written one per line.
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def train(args):
+    model = SimpleNeuralNet(args.inputs, args.neurons, args.layers, args.activation, lr=args.lr,
+                            iterations=args.iterations, batch_size=args.batch_size, shuffle=args.shuffle,
+                            seed=args.seed, optimizer=args.optimizer, dtype=np.dtype(args.dtype),
+                            fused=args.fused, loss=args.loss)
+    X, y, _ = load_dataset(args.dataset)
+    telemetry = Telemetry(model, X, y, profile=True) if args.telemetry else None
+
+    start = time.perf_counter()
+    model.train(X, y, telemetry)
+    elapsed = time.perf_counter() - start
+
+    if telemetry is not None:
+        telemetry.close()
+        if args.telemetry.endswith('.json'):
+            telemetry.to_json(args.telemetry)
+        else:
+            telemetry.to_csv(args.telemetry)
+
+    model.save(args.model)
+    accuracy = np.mean(model.predict_batch(X, args.chunk_size) == y) if len(y) else float('nan')
+    print(f"Trained on {len(y)} samples in {elapsed:.2f} s, training accuracy {accuracy:.4f}, "
+          f"saved to {args.model}", file=sys.stderr)
+
+
+def is_dataset(path):
+    if path == '-':
+        return False
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_chunks(f, chunk_size):
+    # Parses chunk_size text lines at a time into (n, inputs) arrays
+    while True:
+        lines = [line.replace(',', ' ') for line in itertools.islice(f, chunk_size)]
+        if not lines:
+            return
+        lines = [line for line in lines if line.strip()]
+        if lines:
+            yield np.loadtxt(lines, ndmin=2)
+
+
+def predict(args):
+    model = SimpleNeuralNet.load(args.model, mode='r')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        if is_dataset(args.input):
+            X, _, _ = load_dataset(args.input)
+            chunks = (X[start:start + args.chunk_size] for start in range(0, len(X), args.chunk_size))
+        else:
+            f = sys.stdin if args.input == '-' else open(args.input)
+            chunks = read_chunks(f, args.chunk_size)
+
+        for chunk in chunks:
+            if chunk.shape[1] != model.inputs:
+                raise ValueError(f"Expected {model.inputs} values per point, got {chunk.shape[1]}.")
+            labels = model.predict_batch(chunk, args.chunk_size)
+            out.write('\n'.join(map(str, labels.tolist())))
+            out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Train the Task 3 network and run batch predictions headless.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = subparsers.add_parser('train', help='train on a dataset file and save a checkpoint')
+    train_parser.add_argument('dataset', help='dataset file written by Task 1/dataset.py')
+    train_parser.add_argument('model', help='output checkpoint')
+    train_parser.add_argument('--inputs', type=int, default=2)
+    train_parser.add_argument('--neurons', type=int, default=8, help='neurons per hidden layer')
+    train_parser.add_argument('--layers', type=int, default=2, help='hidden layers')
+    train_parser.add_argument('--activation', default='sigmoid', choices=['sigmoid', 'tanh', 'relu'])
+    train_parser.add_argument('--lr', type=float, default=0.08)
+    train_parser.add_argument('--iterations', type=int, default=500)
+    train_parser.add_argument('--batch-size', type=int, default=8)
+    train_parser.add_argument('--shuffle', action='store_true')
+    train_parser.add_argument('--optimizer', default='sgd', choices=['sgd', 'momentum', 'rmsprop', 'adam'])
+    train_parser.add_argument('--dtype', default='float64', choices=['float64', 'float32'])
+    train_parser.add_argument('--fused', action='store_true')
+    train_parser.add_argument('--loss', default='mse', choices=['mse', 'cross_entropy'])
+    train_parser.add_argument('--seed', type=int, default=None)
+    train_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    train_parser.add_argument('--telemetry', help='write per-iteration loss, accuracy and layer times '
+                                                  '(.json for JSON, CSV otherwise)')
+    train_parser.set_defaults(func=train)
+
+    predict_parser = subparsers.add_parser('predict', help='classify points with a saved checkpoint')
+    predict_parser.add_argument('model', help='checkpoint written by train')
+    predict_parser.add_argument('-i', '--input', default='-', help='dataset file or text file, - for stdin')
+    predict_parser.add_argument('-o', '--output', default='-', help='output file, - for stdout')
+    predict_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    predict_parser.set_defaults(func=predict)
+
+    args = parser.parse_args()
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be a positive integer.")
+    args.func(args)
@@ -0,0 +1,55 @@
+import numpy as np
+from linear import LinearLayer
+from activation import ActivationLayer, softmax
+
+class DenseLayer(LinearLayer):
+    """
+    LinearLayer and ActivationLayer fused into one layer. The affine transform,
+    the bias add and the activation all run in place on a single output buffer,
+    and backward turns that buffer into the error of the pre-activation values
+    (the outputs are not needed anymore by then), so every layer keeps one
+    (features, batch) array instead of four.
+    """
+
+    def __init__(self, input_size, output_size, activation, dtype=np.float64):
+        super().__init__(input_size, output_size, dtype)
+        self.activation = activation
+        self.activation_func, _ = ActivationLayer.get_activation_functions(activation, self.dtype)
+
+        # (1, batch) buffers for the column maxima and sums of the softmax
+        self.scratch = {}
+
+    def allocate(self, batch_size):
+        super().allocate(batch_size)
+        if batch_size not in self.scratch:
+            self.scratch[batch_size] = np.empty((1, batch_size), dtype=self.dtype)
+
+    def forward(self, input_data):
+        z = super().forward(input_data)
+        if self.activation == 'softmax':
+            self.output = softmax(z, z, self.scratch.get(z.shape[1]))
+        else:
+            self.output = self.activation_func(z, z)
+        return self.output
+
+    # output_error may be overwritten, it is always a buffer owned by the next
+    # layer or the network. With the softmax head output_error must be the
+    # cross-entropy gradient (output - target), which is passed through as is
+    def backward(self, output_error, propagate=True):
+        y = self.output
+        if self.activation == 'sigmoid':
+            # y * (1 - y) * error
+            output_error *= y
+            np.subtract(1, y, out=y)
+            y *= output_error
+        elif self.activation == 'tanh':
+            # (1 - y^2) * error
+            np.multiply(y, y, out=y)
+            np.subtract(1, y, out=y)
+            y *= output_error
+        elif self.activation == 'relu':
+            np.sign(y, out=y)
+            y *= output_error
+        else:
+            y = output_error
+        return super().backward(y, propagate)
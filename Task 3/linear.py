@@ -1,23 +1,63 @@
 import numpy as np
 
 class LinearLayer:
-    def __init__(self, input_size, output_size):
-        self.W = np.random.randn(output_size, input_size)
-        self.B = np.random.randn(output_size, 1)
+    def __init__(self, input_size, output_size, dtype=np.float64):
+        # The weights are drawn in float64 and then stored in dtype
+        self.dtype = np.dtype(dtype)
+        self.W = np.random.randn(output_size, input_size).astype(self.dtype)
+        self.B = np.random.randn(output_size, 1).astype(self.dtype)
 
         self.dW = None
         self.dB = None
 
+        # Optimizer state (velocity, moments, ...) of W and B, created on the first update
+        self.W_state = None
+        self.B_state = None
+
+        # Preallocated (output, input error, product) buffers per batch size, see allocate
+        self.workspaces = {}
+
+    # Allocates the buffers used by forward and backward for batches of batch_size
+    # samples, after that those batches are processed without allocating memory
+    def allocate(self, batch_size):
+        if batch_size not in self.workspaces:
+            self.workspaces[batch_size] = (np.empty((self.W.shape[0], batch_size), dtype=self.dtype),
+                                           np.empty((self.W.shape[1], batch_size), dtype=self.dtype),
+                                           np.empty((self.W.shape[0], batch_size), dtype=self.dtype))
+        if self.dW is None:
+            self.dW = np.empty_like(self.W)
+            self.dB = np.empty_like(self.B)
+
     def forward(self, input_data):
         self.input = input_data
-        self.output = np.dot(self.W, self.input) + self.B
+        workspace = self.workspaces.get(input_data.shape[1])
+        if workspace is None:
+            self.output = np.dot(self.W, self.input) + self.B
+        else:
+            # A broadcast add of B makes numpy allocate an (output, batch) buffer,
+            # so the output starts as a copy of the bias and the product is added
+            # from its own buffer
+            self.output = workspace[0]
+            np.copyto(self.output, self.B)
+            self.output += np.matmul(self.W, self.input, out=workspace[2])
         return self.output
 
-    def backward(self, output_error):
-        self.dW = np.dot(output_error, self.input.T)
-        self.dB = output_error
-        return np.dot(self.W.T, output_error)
+    # Inputs and errors are (features, batch) matrices, the gradients are summed over the batch.
+    # With propagate=False the error for the previous layer is not computed
+    def backward(self, output_error, propagate=True):
+        workspace = self.workspaces.get(output_error.shape[1])
+        if workspace is None:
+            self.dW = np.dot(output_error, self.input.T)
+            self.dB = np.sum(output_error, axis=1, keepdims=True)
+            return np.dot(self.W.T, output_error) if propagate else None
+
+        np.matmul(output_error, self.input.T, out=self.dW)
+        np.sum(output_error, axis=1, keepdims=True, out=self.dB)
+        return np.matmul(self.W.T, output_error, out=workspace[1]) if propagate else None
 
-    def update_weights(self, input_data, lr):
-        self.W -= lr * self.dW
-        self.B -= lr * self.dB
+    def update_weights(self, optimizer):
+        if self.W_state is None:
+            self.W_state = optimizer.init_state(self.W)
+            self.B_state = optimizer.init_state(self.B)
+        optimizer.update(self.W, self.dW, self.W_state)
+        optimizer.update(self.B, self.dB, self.B_state)
@@ -1,13 +1,23 @@
+import os
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 from neural_network import SimpleNeuralNet
 
+# The Gaussian mixture sampler lives with the Task 1 data generator
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Task 1'))
+from mixture import make_rng, draw_modes, sample_modes
+
+# Points along the longer side of the decision surface grid
+GRID_RESOLUTION = 400
+
 class NeuralNetApp:
-    def __init__(self, root):
+    def __init__(self, root, seed=None):
         self.root = root
+        self.rng = make_rng(seed)
         self.root.title("Neural Network Configurator")
         self.root.geometry("700x300")  # Smaller configuration window
 
@@ -55,14 +65,11 @@ class NeuralNetApp:
         ttk.Button(inputs_frame, text="Generate and Train", command=self.process).grid(row=3, column=0, columnspan=4, pady=10)
 
     def create_data(self, n_samples, n_modes, label):
-        data = []
-        for _ in range(n_modes):
-            mean = np.random.uniform(-1, 1, 2)
-            cov = np.random.uniform(0.1, 0.5, (2, 2))
-            cov = np.dot(cov, cov.T)
-            samples = np.random.multivariate_normal(mean, cov, n_samples)
-            data.append(samples)
-        return np.vstack(data), [label] * len(np.vstack(data))
+        # Covariance of every mode is A @ A.T with the entries of A in [0.1, 0.5]
+        means, transforms = draw_modes(self.rng, n_modes, mean_range=(-1, 1), variance_range=(0.1, 0.5),
+                                       full_covariance=True)
+        data = sample_modes(self.rng, means, transforms, n_samples)
+        return data, np.full(len(data), label, dtype=np.uint8)
 
     def process(self):
         try:
@@ -77,10 +84,11 @@ class NeuralNetApp:
             data_1, labels_1 = self.create_data(samples, modes_1, 1)
 
             X = np.vstack((data_0, data_1))
-            y = np.array(labels_0 + labels_1)
+            y = np.concatenate((labels_0, labels_1))
 
             # Model setup and training
-            model = SimpleNeuralNet(2, neurons, layers, act_func, lr=0.01, iterations=500)
+            model = SimpleNeuralNet(2, neurons, layers, act_func, lr=0.08, iterations=500, batch_size=8, shuffle=True,
+                                    seed=self.rng)
             model.train(X, y)
 
             # Open visualization window
@@ -96,9 +104,14 @@ class NeuralNetApp:
 
         x_min, x_max = X[:, 0].min() - 1, X[:, 0].max() + 1
         y_min, y_max = X[:, 1].min() - 1, X[:, 1].max() + 1
-        xx, yy = np.meshgrid(np.arange(x_min, x_max, 0.1), np.arange(y_min, y_max, 0.1))
 
-        Z = np.array([model.predict(np.array([a, b]))[0] for a, b in zip(xx.ravel(), yy.ravel())])
+        # The longer side of the data gets GRID_RESOLUTION points, the other one
+        # proportionally fewer, so the grid spacing is the same on both axes
+        step = max(x_max - x_min, y_max - y_min) / GRID_RESOLUTION
+        xx, yy = np.meshgrid(np.linspace(x_min, x_max, max(int((x_max - x_min) / step), 2)),
+                             np.linspace(y_min, y_max, max(int((y_max - y_min) / step), 2)))
+
+        Z = model.predict_batch(np.column_stack((xx.ravel(), yy.ravel())))
         Z = Z.reshape(xx.shape)
 
         fig, ax = plt.subplots()
@@ -109,6 +122,13 @@ class NeuralNetApp:
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+        ttk.Button(vis_window, text="Save Model", command=lambda: self.save_model(model)).pack(pady=5)
+
+    def save_model(self, model):
+        path = filedialog.asksaveasfilename(defaultextension=".snn", filetypes=[("Model checkpoint", "*.snn")])
+        if path:
+            model.save(path)
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = NeuralNetApp(root)
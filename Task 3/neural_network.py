@@ -1,18 +1,75 @@
+import json
+import time
 import numpy as np
 from linear import LinearLayer
 from activation import ActivationLayer
+from dense import DenseLayer
+from optimizers import get_optimizer
 
 class SimpleNeuralNet:
-    def __init__(self, inputs, neurons_per_hidden, hidden_layers, act_func='sigmoid', lr=0.1, iterations=400):
+    def __init__(self, inputs, neurons_per_hidden, hidden_layers, act_func='sigmoid', lr=0.1, iterations=400,
+                 batch_size=1, shuffle=False, seed=None, optimizer='sgd', dtype=np.float64, fused=False,
+                 loss='mse'):
         self.lr = lr
+        # Floating point type of the weights, activations and gradients (float64 or float32)
+        self.dtype = np.dtype(dtype)
+        # Optimizer name ('sgd', 'momentum', 'rmsprop', 'adam') using lr, or an optimizer object
+        self.optimizer = get_optimizer(optimizer, lr) if isinstance(optimizer, str) else optimizer
         self.iterations = iterations
+        # Samples per weight update, the update uses the mean gradient of the batch
+        # so batch_size=1 is plain per-sample SGD
+        self.batch_size = batch_size
+        # With shuffle the samples are visited in a new seeded permutation every iteration
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
         self.layers = []
+        self.inputs = inputs
+        self.neurons_per_hidden = neurons_per_hidden
+        self.hidden_layers = hidden_layers
+        self.act_func = act_func
+        self.fused = fused
+        self.loss = loss
 
-        # Configuración de la arquitectura
+        # Configuración de la arquitectura. With fused=True every Linear + Activation
+        # pair is a single DenseLayer. loss='cross_entropy' puts a softmax on the
+        # output layer, loss='mse' uses act_func there too
+        if loss not in ('mse', 'cross_entropy'):
+            raise ValueError("Unsupported loss function")
         structure = [inputs] + [neurons_per_hidden] * hidden_layers + [2]
         for idx in range(len(structure) - 1):
-            self.layers.append(LinearLayer(structure[idx], structure[idx + 1]))
-            self.layers.append(ActivationLayer(act_func))
+            activation = 'softmax' if loss == 'cross_entropy' and idx == len(structure) - 2 else act_func
+            if fused:
+                self.layers.append(DenseLayer(structure[idx], structure[idx + 1], activation, self.dtype))
+            else:
+                self.layers.append(LinearLayer(structure[idx], structure[idx + 1], self.dtype))
+                self.layers.append(ActivationLayer(activation, self.dtype))
+
+        # Batch buffers (inputs, targets, output error, column indices) per batch size, see allocate_workspace
+        self.workspaces = {}
+
+        # Iterations completed by the last train call and wall time of the last one
+        self.epochs_run = 0
+        self.epoch_time = 0.0
+
+    # Allocates every buffer needed to train on batches of batch_size samples.
+    # Batches of that size then run forward and backward without allocating
+    # memory, with the layers writing into their buffers with out= arguments
+    def allocate_workspace(self, batch_size):
+        features = self.inputs
+        for layer in self.layers:
+            if isinstance(layer, LinearLayer):
+                layer.allocate(batch_size)
+                features = layer.W.shape[0]
+            else:
+                layer.allocate(batch_size, features)
+        if batch_size not in self.workspaces:
+            self.workspaces[batch_size] = {
+                'x': np.empty((self.inputs, batch_size), dtype=self.dtype),
+                'y': np.empty((2, batch_size), dtype=self.dtype),
+                'error': np.empty((2, batch_size), dtype=self.dtype),
+                # Column of every sample of a batch, to scatter the one-hot targets
+                'columns': np.arange(batch_size),
+            }
 
     def forward_propagation(self, x):
         activations = [x]
@@ -20,29 +77,187 @@ class SimpleNeuralNet:
             activations.append(layer.forward(activations[-1]))
         return activations
 
-    def backward_propagation(self, x, y):
-        activations = self.forward_propagation(x)
-        errors = [None] * len(self.layers)
+    # Output of the network only, without keeping the list of activations
+    def forward(self, x):
+        for layer in self.layers:
+            x = layer.forward(x)
+        return x
+
+    # Fills dW and dB of every linear layer with the gradient of the mean loss of the batch
+    def gradients(self, x, y):
+        output = self.forward(x)
+
+        # Error en la salida (media del batch, x e y son matrices (features, batch)).
+        # output - y is the gradient of both the squared error and, after a
+        # softmax, the cross-entropy loss
+        workspace = self.workspaces.get(x.shape[1])
+        if workspace is None:
+            error = output - y
+        else:
+            error = np.subtract(output, y, out=workspace['error'])
+        error /= x.shape[1]
 
-        # Error en la salida
-        errors[-1] = activations[-1] - y
         for i in range(len(self.layers) - 1, 0, -1):
-            errors[i - 1] = self.layers[i].backward(errors[i])
-        self.layers[0].backward(errors[0])
+            error = self.layers[i].backward(error)
+        self.layers[0].backward(error, propagate=False)
+
+    def backward_propagation(self, x, y):
+        self.gradients(x, y)
 
         # Actualizar pesos
-        for i, layer in enumerate(self.layers):
+        for layer in self.layers:
             if isinstance(layer, LinearLayer):
-                layer.update_weights(activations[i], self.lr)
+                layer.update_weights(self.optimizer)
+
+    # callback(net) is called after every iteration, returning True stops training.
+    # X (N, inputs) and y (N,) are only read one batch at a time: the batch is cast
+    # into the input workspace as columns and its one-hot targets are written into
+    # the target workspace, so a memory-mapped dataset is never copied as a whole
+    def train(self, X, y, callback=None):
+        n = len(X)
+        order = np.arange(n) if self.shuffle else None
+
+        # Buffers for the full batches and the last, smaller one
+        self.allocate_workspace(min(self.batch_size, n))
+        if n % self.batch_size:
+            self.allocate_workspace(n % self.batch_size)
+
+        self.epochs_run = 0
+        for iteration in range(self.iterations):
+            start_time = time.perf_counter()
+            if self.shuffle:
+                self.rng.shuffle(order)
+
+            for start in range(0, n, self.batch_size):
+                stop = min(start + self.batch_size, n)
+                rows = order[start:stop] if self.shuffle else slice(start, stop)
+                workspace = self.workspaces[stop - start]
+                x, t = workspace['x'], workspace['y']
+                x[...] = X[rows].T
+                t.fill(0)
+                t[y[rows], workspace['columns']] = 1
+                self.backward_propagation(x, t)
 
-    def train(self, X, y):
-        for _ in range(self.iterations):
-            for idx in range(X.shape[0]):
-                x_i = X[idx].reshape(-1, 1)
-                y_i = np.zeros((2, 1))
-                y_i[int(y[idx])] = 1
-                self.backward_propagation(x_i, y_i)
+            self.epochs_run = iteration + 1
+            self.epoch_time = time.perf_counter() - start_time
+            if callback is not None and callback(self):
+                break
+
+    # Training on a dataset file written by dataset.py, read batch by batch from
+    # the memory map. Task 1 has to be on sys.path, as the Task 3 entry points set it up
+    def train_file(self, path, callback=None):
+        from dataset import load_dataset
+
+        X, y, _ = load_dataset(path)
+        self.train(X, y, callback)
 
     def predict(self, x):
-        activations = self.forward_propagation(x.reshape(-1, 1))
+        activations = self.forward_propagation(x.reshape(-1, 1).astype(self.dtype, copy=False))
         return np.argmax(activations[-1]), activations[-1].flatten()
+
+    # Classes of all the rows of X with shape (N, inputs), one forward pass per
+    # chunk of chunk_size rows so the intermediate activations stay bounded
+    def predict_batch(self, X, chunk_size=65536):
+        X = np.asarray(X)
+        labels = np.empty(len(X), dtype=np.intp)
+        for start in range(0, len(X), chunk_size):
+            output = self.forward(X[start:start + chunk_size].T.astype(self.dtype, copy=False))
+            labels[start:start + chunk_size] = np.argmax(output, axis=0)
+        return labels
+
+    # Mean loss (the one the network is trained with) and accuracy over X (N, inputs)
+    # and y (N,), evaluated in chunks like predict_batch
+    def evaluate(self, X, y, chunk_size=65536):
+        X = np.asarray(X)
+        y = np.asarray(y)
+        loss, correct = 0.0, 0
+        for start in range(0, len(X), chunk_size):
+            output = self.forward(X[start:start + chunk_size].T.astype(self.dtype, copy=False))
+            labels = y[start:start + chunk_size]
+            correct += np.count_nonzero(np.argmax(output, axis=0) == labels)
+            if self.loss == 'cross_entropy':
+                probabilities = output[labels, np.arange(len(labels))]
+                loss -= float(np.sum(np.log(np.maximum(probabilities, np.finfo(self.dtype).tiny))))
+            else:
+                loss += 0.5 * float(np.sum((output - one_hot(labels, dtype=self.dtype)) ** 2))
+        return loss / len(X), correct / len(X)
+
+    # Constructor arguments of the network, the optimizer by name
+    def get_config(self):
+        return {
+            'inputs': self.inputs,
+            'neurons_per_hidden': self.neurons_per_hidden,
+            'hidden_layers': self.hidden_layers,
+            'act_func': self.act_func,
+            'lr': self.lr,
+            'iterations': self.iterations,
+            'batch_size': self.batch_size,
+            'shuffle': self.shuffle,
+            'optimizer': type(self.optimizer).__name__.lower(),
+            'dtype': self.dtype.name,
+            'fused': self.fused,
+            'loss': self.loss,
+        }
+
+    # Checkpoints: a JSON header with the constructor arguments and the shape and
+    # offset of every W and B, followed by the raw parameters (each one starting on
+    # a 64-byte boundary)
+    def save(self, path):
+        header = {'config': self.get_config(), 'params': []}
+        params = [param for layer in self.layers if isinstance(layer, LinearLayer) for param in (layer.W, layer.B)]
+        offset = 0
+        for param in params:
+            header['params'].append({'shape': list(param.shape), 'offset': offset})
+            offset += -(-param.nbytes // CHECKPOINT_ALIGNMENT) * CHECKPOINT_ALIGNMENT
+
+        text = json.dumps(header).encode('utf-8')
+        text += b' ' * (-(len(CHECKPOINT_MAGIC) + 8 + len(text)) % CHECKPOINT_ALIGNMENT)
+        with open(path, 'wb') as f:
+            f.write(CHECKPOINT_MAGIC)
+            f.write(np.uint64(len(text)).tobytes())
+            f.write(text)
+            start = f.tell()
+            for param, entry in zip(params, header['params']):
+                f.seek(start + entry['offset'])
+                f.write(np.ascontiguousarray(param, dtype=self.dtype).tobytes())
+
+    # Loads a checkpoint written by save. The parameters are memory-mapped, with
+    # mode='c' (copy-on-write) the model can still be trained without changing
+    # the file, mode='r' makes them read-only
+    @classmethod
+    def load(cls, path, mode='c'):
+        with open(path, 'rb') as f:
+            if f.read(len(CHECKPOINT_MAGIC)) != CHECKPOINT_MAGIC:
+                raise ValueError(f"{path} is not a model checkpoint")
+            length = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+            header = json.loads(f.read(length).decode('utf-8'))
+        start = len(CHECKPOINT_MAGIC) + 8 + length
+
+        # Building the layers draws random weights, which must not disturb np.random
+        state = np.random.get_state()
+        model = cls(**header['config'])
+        np.random.set_state(state)
+
+        dtype = model.dtype
+        data = np.memmap(path, dtype=np.uint8, mode=mode, offset=start) if header['params'] else None
+        entries = iter(header['params'])
+        for layer in model.layers:
+            if isinstance(layer, LinearLayer):
+                for name in ('W', 'B'):
+                    entry = next(entries)
+                    size = int(np.prod(entry['shape'])) * dtype.itemsize
+                    param = np.asarray(data[entry['offset']:entry['offset'] + size]).view(dtype)
+                    setattr(layer, name, param.reshape(entry['shape']))
+        return model
+
+
+CHECKPOINT_MAGIC = b'SNNCKPT\x01'
+CHECKPOINT_ALIGNMENT = 64
+
+
+# One-hot targets with shape (2, N) for the labels y with shape (N,)
+def one_hot(y, n_classes=2, dtype=np.float64):
+    y = np.asarray(y, dtype=np.intp)
+    targets = np.zeros((n_classes, len(y)), dtype=dtype)
+    targets[y, np.arange(len(y))] = 1
+    return targets
@@ -0,0 +1,107 @@
+import math
+import numpy as np
+
+# Optimizers for LinearLayer.update_weights. Every parameter (W and B of every
+# layer) has its own state dict, created by init_state and kept next to the
+# parameter in the layer. All updates are done in place, using the "tmp"
+# buffer of the state instead of allocating temporaries.
+
+class SGD:
+    def __init__(self, lr=0.1):
+        self.lr = lr
+
+    def init_state(self, param):
+        return {'tmp': np.empty_like(param)}
+
+    def update(self, param, grad, state):
+        tmp = state['tmp']
+        np.multiply(grad, self.lr, out=tmp)
+        param -= tmp
+
+
+class Momentum(SGD):
+    def __init__(self, lr=0.1, momentum=0.9):
+        super().__init__(lr)
+        self.momentum = momentum
+
+    def init_state(self, param):
+        return {'tmp': np.empty_like(param), 'velocity': np.zeros_like(param)}
+
+    def update(self, param, grad, state):
+        tmp, velocity = state['tmp'], state['velocity']
+        # v = momentum * v - lr * grad, param += v
+        velocity *= self.momentum
+        np.multiply(grad, self.lr, out=tmp)
+        velocity -= tmp
+        param += velocity
+
+
+class RMSProp(SGD):
+    def __init__(self, lr=0.01, rho=0.9, eps=1e-8):
+        super().__init__(lr)
+        self.rho = rho
+        self.eps = eps
+
+    def init_state(self, param):
+        return {'tmp': np.empty_like(param), 'square_avg': np.zeros_like(param)}
+
+    def update(self, param, grad, state):
+        tmp, square_avg = state['tmp'], state['square_avg']
+        # s = rho * s + (1 - rho) * grad^2, param -= lr * grad / (sqrt(s) + eps)
+        square_avg *= self.rho
+        np.multiply(grad, grad, out=tmp)
+        tmp *= 1 - self.rho
+        square_avg += tmp
+        np.sqrt(square_avg, out=tmp)
+        tmp += self.eps
+        np.divide(grad, tmp, out=tmp)
+        tmp *= self.lr
+        param -= tmp
+
+
+class Adam(SGD):
+    def __init__(self, lr=0.01, beta1=0.9, beta2=0.999, eps=1e-8):
+        super().__init__(lr)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+
+    def init_state(self, param):
+        return {'tmp': np.empty_like(param), 'm': np.zeros_like(param), 'v': np.zeros_like(param), 't': 0}
+
+    def update(self, param, grad, state):
+        tmp, m, v = state['tmp'], state['m'], state['v']
+        state['t'] += 1
+        t = state['t']
+
+        m *= self.beta1
+        np.multiply(grad, 1 - self.beta1, out=tmp)
+        m += tmp
+        v *= self.beta2
+        np.multiply(grad, grad, out=tmp)
+        tmp *= 1 - self.beta2
+        v += tmp
+
+        # Bias correction folded into the step size and epsilon:
+        # param -= lr * m_hat / (sqrt(v_hat) + eps). Python floats keep float32
+        # parameters in float32 arithmetic
+        correction = math.sqrt(1 - self.beta2 ** t)
+        step_size = self.lr * correction / (1 - self.beta1 ** t)
+        np.sqrt(v, out=tmp)
+        tmp += self.eps * correction
+        np.divide(m, tmp, out=tmp)
+        tmp *= step_size
+        param -= tmp
+
+
+def get_optimizer(name, lr):
+    if name == 'sgd':
+        return SGD(lr)
+    elif name == 'momentum':
+        return Momentum(lr)
+    elif name == 'rmsprop':
+        return RMSProp(lr)
+    elif name == 'adam':
+        return Adam(lr)
+    else:
+        raise ValueError("Unsupported optimizer")
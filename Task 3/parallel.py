@@ -0,0 +1,236 @@
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from linear import LinearLayer
+from neural_network import SimpleNeuralNet, one_hot
+
+# The dataset format and the mixture sampler live with the Task 1 data generator
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Task 1'))
+from dataset import load_dataset
+from mixture import sample_mixture
+
+
+# Data-parallel training of a SimpleNeuralNet. X and y are split into one
+# shard per worker process (every workers-th sample, so each shard has all the
+# classes even when the data is sorted by label) and the W and B of every linear layer live
+# in one flat shared memory block that all the workers map, so no weights are
+# ever pickled between processes.
+#
+# mode='sync': every step each worker computes the gradient of a batch of its
+# shard (batch_size / workers samples) into its own row of a shared gradient
+# block. After a barrier each worker averages one slice of the parameters over
+# the workers and applies the optimizer to it, and a second barrier publishes
+# the new weights. This is mini-batch training with batches of batch_size
+# samples, only spread over the workers.
+#
+# mode='hogwild': every worker trains on its shard with batches of batch_size
+# samples and updates the shared weights in place without any locking.
+#
+# The workers are single threaded, run with OMP_NUM_THREADS=1 (or the setting of
+# your BLAS) so the BLAS threads do not compete with them.
+
+# Set in every worker, keeps the shared memory blocks mapped while the process runs
+_shared = {}
+
+
+def _to_shared(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    _shared.setdefault('blocks', []).append(shm)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _views(layers, flat):
+    # Consecutive slices of flat shaped like the W and B of every linear layer
+    views, offset = [], 0
+    for layer in layers:
+        for param in (layer.W, layer.B):
+            views.append(flat[offset:offset + param.size].reshape(param.shape))
+            offset += param.size
+    return views
+
+
+def _worker(rank, workers, mode, config, optimizer, seed, arrays, barrier):
+    try:
+        X, y, params, grads, counts = (_attach(*array) for array in arrays)
+
+        net = SimpleNeuralNet(seed=seed, **config)
+        net.optimizer = optimizer
+        linear = [layer for layer in net.layers if isinstance(layer, LinearLayer)]
+        views = _views(linear, params)
+        for i, layer in enumerate(linear):
+            layer.W, layer.B = views[2 * i], views[2 * i + 1]
+
+        if mode == 'hogwild':
+            net.train(X[rank::workers], y[rank::workers])
+            return
+
+        X_cols = X[rank::workers].T
+        Y_cols = one_hot(y[rank::workers], dtype=net.dtype)
+        n = X_cols.shape[1]
+        batch_size = -(-net.batch_size // workers)
+        # Every worker runs the same number of steps, the ones past the end of a
+        # shorter shard contribute an empty batch
+        steps = -(-(-(-len(X) // workers)) // batch_size)
+
+        net.allocate_workspace(min(batch_size, n))
+        if n % batch_size:
+            net.allocate_workspace(n % batch_size)
+        views = _views(linear, grads[rank])
+        for i, layer in enumerate(linear):
+            layer.dW, layer.dB = views[2 * i], views[2 * i + 1]
+
+        # The slice of the parameters this worker averages and updates
+        lo, hi = rank * len(params) // workers, (rank + 1) * len(params) // workers
+        mean_grad = np.empty(hi - lo, dtype=net.dtype)
+        state = optimizer.init_state(params[lo:hi])
+        order = np.arange(n)
+
+        for _ in range(net.iterations):
+            if net.shuffle:
+                net.rng.shuffle(order)
+
+            for step in range(steps):
+                batch = order[step * batch_size:(step + 1) * batch_size]
+                if len(batch):
+                    workspace = net.workspaces[len(batch)]
+                    x = np.take(X_cols, batch, axis=1, out=workspace['x'], mode='clip')
+                    t = np.take(Y_cols, batch, axis=1, out=workspace['y'], mode='clip')
+                    net.gradients(x, t)
+                    # Gradient summed over the batch, divided by the total below
+                    grads[rank] *= len(batch)
+                else:
+                    grads[rank] = 0
+                counts[rank] = len(batch)
+                barrier.wait()
+
+                np.sum(grads[:, lo:hi], axis=0, out=mean_grad)
+                mean_grad /= counts.sum()
+                optimizer.update(params[lo:hi], mean_grad, state)
+                barrier.wait()
+    except BaseException:
+        # Releases the other workers instead of leaving them waiting on the barrier
+        barrier.abort()
+        raise
+
+
+def train_parallel(model, X, y, workers=None, mode='sync'):
+    """
+    Train model on X (N, inputs) and y (N,) with `workers` processes (all cores
+    by default) and return it. The iterations, batch size, shuffling and
+    optimizer of the model are used; in 'sync' mode batch_size is the number of
+    samples per update over all the workers, in 'hogwild' mode the one of every
+    worker. The optimizer state stays in the workers.
+    """
+    if mode not in ('sync', 'hogwild'):
+        raise ValueError("mode must be 'sync' or 'hogwild'")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    X = np.ascontiguousarray(X, dtype=model.dtype)
+    y = np.ascontiguousarray(y)
+    if len(X) < workers:
+        raise ValueError("Every worker needs at least one sample.")
+
+    linear = [layer for layer in model.layers if isinstance(layer, LinearLayer)]
+    params = np.concatenate([param.ravel() for layer in linear for param in (layer.W, layer.B)])
+    grads = np.zeros((workers, len(params)), dtype=model.dtype)
+    counts = np.zeros(workers, dtype=np.int64)
+    # Seeds of the per-worker shuffles, drawn from the model's generator
+    seeds = model.rng.integers(2 ** 63, size=workers).tolist()
+
+    blocks = [_to_shared(array) for array in (X, y, params, grads, counts)]
+    try:
+        arrays = [(shm.name, array.shape, array.dtype) for shm, array in zip(blocks, (X, y, params, grads, counts))]
+        config = model.get_config()
+        del config['optimizer']
+        barrier = multiprocessing.Barrier(workers)
+        processes = [multiprocessing.Process(target=_worker, args=(rank, workers, mode, config, model.optimizer,
+                                                                   seeds[rank], arrays, barrier))
+                     for rank in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        if any(process.exitcode != 0 for process in processes):
+            raise RuntimeError("A training worker failed.")
+
+        trained = np.ndarray(params.shape, dtype=params.dtype, buffer=blocks[2].buf)
+        for param, view in zip([param for layer in linear for param in (layer.W, layer.B)], _views(linear, trained)):
+            np.copyto(param, view)
+        del trained, view
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return model
+
+
+def speedup_curve(X, y, worker_counts, neurons_per_hidden, hidden_layers, mode='sync', seed=0, **net_kwargs):
+    """
+    Train the same network (same initial weights) with every number of workers
+    in worker_counts. Returns one dict per count with the wall time, samples per
+    second, speedup over the first count and training accuracy.
+    """
+    rows = []
+    for workers in worker_counts:
+        np.random.seed(seed)
+        model = SimpleNeuralNet(X.shape[1], neurons_per_hidden, hidden_layers, seed=seed, **net_kwargs)
+        start = time.perf_counter()
+        train_parallel(model, X, y, workers, mode)
+        wall_time = time.perf_counter() - start
+        rows.append({
+            'workers': workers,
+            'wall_time': wall_time,
+            'samples_per_sec': len(X) * model.iterations / wall_time,
+            'speedup': rows[0]['wall_time'] / wall_time if rows else 1.0,
+            'accuracy': float(np.mean(model.predict_batch(X) == y)),
+        })
+    return rows
+
+
+def format_table(rows):
+    lines = [f"{'workers':>8} {'time [s]':>9} {'samples/s':>11} {'speedup':>8} {'accuracy':>9}"]
+    for row in rows:
+        lines.append(f"{row['workers']:>8} {row['wall_time']:>9.3f} {row['samples_per_sec']:>11.0f} "
+                     f"{row['speedup']:>8.2f} {row['accuracy']:>9.3f}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Speedup of data-parallel training of the Task 3 network.')
+    parser.add_argument('--dataset', help='dataset file written by dataset.py (generated data otherwise)')
+    parser.add_argument('--modes', type=int, default=2, help='modes per class of the generated data')
+    parser.add_argument('--samples', type=int, default=50000, help='samples per mode of the generated data')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--mode', default='sync', choices=['sync', 'hogwild'])
+    parser.add_argument('--neurons', type=int, default=64, help='neurons per hidden layer')
+    parser.add_argument('--layers', type=int, default=2, help='hidden layers')
+    parser.add_argument('--activation', default='sigmoid', choices=['sigmoid', 'tanh', 'relu'])
+    parser.add_argument('--optimizer', default='adam', choices=['sgd', 'momentum', 'rmsprop', 'adam'])
+    parser.add_argument('--lr', type=float, default=0.01)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--dtype', default='float64', choices=['float64', 'float32'])
+    args = parser.parse_args()
+
+    if args.dataset:
+        X, y, _ = load_dataset(args.dataset)
+    else:
+        X, y = sample_mixture(args.modes, args.samples, mean_range=(-1, 1), variance_range=(0.1, 0.5),
+                              full_covariance=True, seed=0)
+
+    rows = speedup_curve(X, y, args.workers, args.neurons, args.layers, args.mode, act_func=args.activation,
+                         optimizer=args.optimizer, lr=args.lr, batch_size=args.batch_size,
+                         iterations=args.iterations, shuffle=True, dtype=np.dtype(args.dtype))
+    print(f"{len(X)} samples, {args.mode} mode")
+    print(format_table(rows))
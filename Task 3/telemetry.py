@@ -0,0 +1,119 @@
+import csv
+import json
+import time
+
+
+# Training telemetry for SimpleNeuralNet. A Telemetry object is passed as the
+# train callback and records, after every iteration, the epoch wall time and
+# optionally the loss and accuracy on a dataset and the cumulative time spent in
+# every layer:
+#
+#   telemetry = Telemetry(net, X, y, profile=True)
+#   net.train(X, y, callback=telemetry)
+#   telemetry.to_csv('run.csv')
+#
+# Nothing is patched into the network unless profiling is requested, so a net
+# trained without telemetry runs the plain layer methods.
+
+
+def _timed(method, stats, key):
+    # Wraps a bound method, adding its wall time to stats[key]
+    perf_counter = time.perf_counter
+
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        result = method(*args, **kwargs)
+        stats[key] += perf_counter() - start
+        return result
+    return timed
+
+
+class LayerProfiler:
+    # Cumulative forward, backward and update time of every layer of a net. While
+    # attached the timed methods shadow the class methods on the layer instances
+    METHODS = (('forward', 'forward'), ('backward', 'backward'), ('update_weights', 'update'))
+
+    def __init__(self, net):
+        self.layers = net.layers
+        self.stats = []
+        for i, layer in enumerate(self.layers):
+            stats = {'layer': i, 'type': type(layer).__name__}
+            stats.update((key, 0.0) for method, key in self.METHODS if hasattr(layer, method))
+            self.stats.append(stats)
+
+    # Timed keys of a stats entry
+    def keys(self, stats):
+        return [key for _, key in self.METHODS if key in stats]
+
+    def attach(self):
+        for layer, stats in zip(self.layers, self.stats):
+            for method, key in self.METHODS:
+                if key in stats and method not in vars(layer):
+                    setattr(layer, method, _timed(getattr(layer, method), stats, key))
+        return self
+
+    def detach(self):
+        for layer in self.layers:
+            for method, _ in self.METHODS:
+                vars(layer).pop(method, None)
+
+    def reset(self):
+        for stats in self.stats:
+            for key in self.keys(stats):
+                stats[key] = 0.0
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, *exc):
+        self.detach()
+
+
+class Telemetry:
+    def __init__(self, net, X=None, y=None, profile=False, every=1):
+        """
+        Callback recording one row per iteration of net.train. With X and y the
+        loss and accuracy on that data are evaluated every `every` iterations,
+        with profile=True the per-layer times are recorded as well (the
+        profiler stays attached until close is called).
+        """
+        self.X = X
+        self.y = y
+        self.every = every
+        self.history = []
+        self.profiler = LayerProfiler(net).attach() if profile else None
+
+    def __call__(self, net):
+        row = {'epoch': net.epochs_run, 'epoch_time': net.epoch_time}
+        if self.X is not None and net.epochs_run % self.every == 0:
+            # The forward passes of the evaluation are not training time
+            saved = [dict(stats) for stats in self.profiler.stats] if self.profiler is not None else []
+            row['loss'], row['accuracy'] = net.evaluate(self.X, self.y)
+            for stats, old in zip(self.profiler.stats if saved else [], saved):
+                stats.update(old)
+        if self.profiler is not None:
+            for stats in self.profiler.stats:
+                for key in self.profiler.keys(stats):
+                    row[f"{stats['layer']}_{stats['type']}_{key}"] = stats[key]
+        self.history.append(row)
+
+    def close(self):
+        if self.profiler is not None:
+            self.profiler.detach()
+
+    def fieldnames(self):
+        names = ['epoch', 'epoch_time', 'loss', 'accuracy']
+        for row in self.history:
+            names.extend(name for name in row if name not in names)
+        return names
+
+    def to_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames())
+            writer.writeheader()
+            writer.writerows(self.history)
+
+    def to_json(self, path):
+        data = {'epochs': self.history, 'layers': self.profiler.stats if self.profiler is not None else []}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
@@ -288,234 +288,445 @@ class HumanPlayer(Player):
 # DO NOT MODIFY CODE ABOVE THIS LINE
 # ----------------------------------
 
+from heapq import heappush, heappop
+
+INF = float('inf')
+
+
+class SearchGrid:
+    """
+    Integer view of the board used by the planners.
+
+    The board is padded with a one-cell wall border and cell (x, y) is the index
+    (y + 1) * stride + x + 1, so the neighbours of a cell are index -/+ stride
+    and -/+ 1 and never need a bounds check. blocked holds 1 for the border,
+    the obstacles and the snake body and 0 for free cells. Positions and
+    Directions are only built when entering and leaving a search.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        self.size = self.stride * (height + 2)
+
+        self.walls = bytearray([1]) * self.size
+        for y in range(height):
+            row = (y + 1) * self.stride + 1
+            self.walls[row:row + width] = bytes(width)
+        self.blocked = bytearray(self.walls)
+
+        # Neighbour offsets in the order of Direction, and the way back
+        self.offsets = (-self.stride, self.stride, -1, 1)
+        self.directions = dict(zip(self.offsets, Direction))
+
+        # Per-cell search arrays, allocated once and reset by every search
+        self.unreached = [INF] * self.size
+        self.distances = list(self.unreached)
+        self.parents = [-1] * self.size
+        self.seen = bytearray(self.size)
+
+    def index(self, position: Position) -> int:
+        return (position.y + 1) * self.stride + position.x + 1
+
+    def position(self, index: int) -> Position:
+        y, x = divmod(index, self.stride)
+        return Position(x - 1, y - 1)
+
+    def manhattan(self, a: int, b: int) -> int:
+        # Manhattan distance between two cell indices
+        ay, ax = divmod(a, self.stride)
+        by, bx = divmod(b, self.stride)
+        return abs(ax - bx) + abs(ay - by)
+
+    def update(self, snake: Snake, obstacles: Set[Obstacle]):
+        blocked = self.blocked
+        blocked[:] = self.walls
+        for obstacle in obstacles:
+            blocked[self.index(obstacle.position)] = 1
+        for segment in snake.positions[1:]:
+            blocked[self.index(segment)] = 1
+
+    def steps(self, cells: List[int]) -> List[Direction]:
+        # Directions that walk along consecutive cells
+        return [self.directions[b - a] for a, b in zip(cells, cells[1:])]
+
+    def path(self, start: int, goal: int) -> List[Direction]:
+        # Directions from start to goal following the parents array
+        cells = [goal]
+        while cells[-1] != start:
+            cells.append(self.parents[cells[-1]])
+        cells.reverse()
+        return self.steps(cells)
+
+
+class DStarLite:
+    """
+    D* Lite (Koenig and Likhachev) on a SearchGrid.
+
+    The search runs from the goal back to the start, so g and rhs hold the
+    distance of every cell to the goal and stay valid when the start moves.
+    They are kept between calls: after the start moved and some cells became
+    free or blocked, only the cells whose distance changed are expanded again.
+    The start cell is never treated as blocked. A new goal needs a new planner.
+    """
+
+    def __init__(self, grid: SearchGrid, start: int, goal: int):
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        # Offset added to every key after the start moved, instead of re-keying the queue
+        self.km = 0
+        self.g = [INF] * grid.size
+        self.rhs = [INF] * grid.size
+        self.rhs[goal] = 0
+        # (k1, k2, cell) entries, outdated ones are skipped or re-keyed when popped
+        self.queue = [(grid.manhattan(start, goal), 0, goal)]
+
+    def key(self, cell: int):
+        k = min(self.g[cell], self.rhs[cell])
+        return k + self.grid.manhattan(self.start, cell) + self.km, k
+
+    def update_vertex(self, cell: int):
+        grid, g, rhs = self.grid, self.g, self.rhs
+        if cell != self.goal:
+            if grid.blocked[cell] and cell != self.start:
+                rhs[cell] = INF
+            else:
+                best = INF
+                for offset in grid.offsets:
+                    neighbor = cell + offset
+                    if not grid.blocked[neighbor] and g[neighbor] + 1 < best:
+                        best = g[neighbor] + 1
+                rhs[cell] = best
+        if g[cell] != rhs[cell]:
+            heappush(self.queue, (*self.key(cell), cell))
+
+    def move(self, start: int, changed: Set[int]):
+        # The start moved to start and the cells in changed became free or blocked
+        self.km += self.grid.manhattan(self.start, start)
+        changed = changed | {self.start, start}
+        self.start = start
+        for cell in changed:
+            self.update_vertex(cell)
+            for offset in self.grid.offsets:
+                self.update_vertex(cell + offset)
+
+    def compute(self, expanded: List[int]):
+        g, rhs, queue, offsets = self.g, self.rhs, self.queue, self.grid.offsets
+        start = self.start
+
+        while queue:
+            k1, k2, cell = queue[0]
+            if g[cell] == rhs[cell]:
+                heappop(queue)
+                continue
+            if (k1, k2) >= self.key(start) and rhs[start] <= g[start]:
+                break
+
+            heappop(queue)
+            new_key = self.key(cell)
+            if (k1, k2) < new_key:
+                heappush(queue, (*new_key, cell))
+                continue
+
+            expanded.append(cell)
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INF
+                self.update_vertex(cell)
+            for offset in offsets:
+                self.update_vertex(cell + offset)
+
+    def next_step(self):
+        # First move of a shortest path from the start, None when there is none
+        grid, g, start = self.grid, self.g, self.start
+        if start == self.goal or self.rhs[start] == INF:
+            return None
+        best, step = INF, None
+        for offset, direction in grid.directions.items():
+            neighbor = start + offset
+            if not grid.blocked[neighbor] and g[neighbor] + 1 < best:
+                best, step = g[neighbor] + 1, direction
+        return step
+
 
 class SearchBasedPlayer(Player):
-    ALGORITHM = "Dijkstra"  # This can be set to "BFS", "DFS", "Dijkstra", or "A*"
+    ALGORITHM = "Dijkstra"  # This can be set to "BFS", "DFS", "IDDFS", "Dijkstra", "A*" or "D* Lite"
+    # Maximum number of cells DFS and IDDFS expand per search. When it runs out the
+    # snake heads for the expanded cell closest to the food. None means no limit
+    NODE_BUDGET = None
 
     def __init__(self):
         super().__init__()
-        self.visited: Set[Position] = set()  # Set to track visited nodes
-        self.obstacles: Set[Position] = set()  # Set to track obstacle positions
+        self.visited: List[Position] = []  # Cells expanded by the last search
+        self.expanded: List[int] = []  # The same cells as grid indices, filled during the search
+        self.grid = SearchGrid(GRID_WIDTH, GRID_HEIGHT)
 
-    def search_path(self, snake: Snake, food: Food, obstacles: Set[Obstacle]):
-        
-        
-        self.visited.clear()  # Clear any previous visited positions
-        self.obstacles = {obstacle.position for obstacle in obstacles}  # Update obstacles
+        # D* Lite state kept between searches: the planner and the blocked cells it knows about
+        self.planner = None
+        self.blocked_cells: Set[int] = set()
 
-        
-        for segment in snake.positions[1:]:
-            self.obstacles.add(segment)
+    def search_path(self, snake: Snake, food: Food, obstacles: Set[Obstacle]):
+        if (self.grid.width, self.grid.height) != (GRID_WIDTH, GRID_HEIGHT):
+            self.grid = SearchGrid(GRID_WIDTH, GRID_HEIGHT)
+        self.grid.update(snake, obstacles)  # Walls, obstacles and snake body
+        self.expanded.clear()
 
-        
         if self.ALGORITHM == "BFS":
-            return self.bfs_search(snake, food, obstacles)
+            self.bfs_search(snake, food, obstacles)
         elif self.ALGORITHM == "DFS":
-            return self.dfs_search(snake, food, obstacles)
+            self.dfs_search(snake, food, obstacles)
+        elif self.ALGORITHM == "IDDFS":
+            self.iddfs_search(snake, food, obstacles)
         elif self.ALGORITHM == "Dijkstra":
-            return self.dijkstra_search(snake, food, obstacles)
+            self.dijkstra_search(snake, food, obstacles)
         elif self.ALGORITHM == "A*":
-            return self.a_star_search(snake, food, obstacles)
+            self.a_star_search(snake, food, obstacles)
+        elif self.ALGORITHM == "D* Lite":
+            self.d_star_lite_search(snake, food, obstacles)
         else:
             raise ValueError(f"Unknown algorithm: {self.ALGORITHM}")
 
+        # IDDFS expands cells once per iteration, they are drawn once
+        self.visited = [self.grid.position(cell) for cell in dict.fromkeys(self.expanded)]
+
     # BFS Algorithm
     def bfs_search(self, snake: Snake, food: Food, obstacles: Set[Obstacle]):
-        
-        backtrack = [[None for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
-        queue = deque()
-        head = snake.get_head_position()
-        queue.append((head, None, 0))  # (current position, parent position, cost)
-        
-        found = False
-        while queue and not found:
-            current, previous, cost = queue.popleft()
-            x, y = current.x, current.y
-
-            if current in self.visited or current in self.obstacles:
-                continue
-
-            self.visited.add(current)
-            backtrack[x][y] = (previous, cost)
-
-            if current == food.position:
-                found = True
-                break
-
-            for direction in Direction:
-                dx, dy = direction.value
-                neighbor = Position(x + dx, y + dy)
-
-                if (
-                    0 <= neighbor.x < GRID_WIDTH
-                    and 0 <= neighbor.y < GRID_HEIGHT
-                    and neighbor not in self.visited
-                    and neighbor not in self.obstacles
-                ):
-                    queue.append((neighbor, current, cost + 1))
-
-        path = []
-        if found:
-            current = food.position
-            while current != head:
-                previous, _ = backtrack[current.x][current.y]
-                dx = current.x - previous.x
-                dy = current.y - previous.y
-                path.append(Direction((dx, dy)))
-                current = previous
+        grid = self.grid
+        seen, parents, offsets, expanded = grid.seen, grid.parents, grid.offsets, self.expanded
+        # Blocked cells count as seen, so one lookup checks both
+        seen[:] = grid.blocked
+
+        start = grid.index(snake.get_head_position())
+        goal = grid.index(food.position)
+        seen[start] = 1
+        queue = deque([start])
+
+        while queue:
+            current = queue.popleft()
+            expanded.append(current)
+
+            if current == goal:
+                self.chosen_path = grid.path(start, goal)
+                return
 
-            path.reverse()
+            for offset in offsets:
+                neighbor = current + offset
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    parents[neighbor] = current
+                    queue.append(neighbor)
 
-        self.chosen_path = path
+        self.chosen_path = []
 
     # DFS Algorithm
     def dfs_search(self, snake: Snake, food: Food, obstacles: Set[Obstacle]):
-        shortest_path = None
-        stack = [(snake.get_head_position(), [], 0)]
-        while stack:
-            current, path, cost = stack.pop()
+        # Iterative DFS on a stack of cells. A cell records the cell that pushed it
+        # last in parents, which is also the one it is popped for, so the path is
+        # read back from parents instead of being copied on every push. The first
+        # path found is taken, it is usually not the shortest one (see IDDFS)
+        grid = self.grid
+        seen, parents, offsets, expanded = grid.seen, grid.parents, grid.offsets, self.expanded
+        seen[:] = grid.blocked
+        budget = self.NODE_BUDGET
+
+        start = grid.index(snake.get_head_position())
+        goal = grid.index(food.position)
+        # The head can sit on an obstacle cell, the search still starts there
+        seen[start] = 0
+        stack = [start]
 
-            if shortest_path and len(path) >= len(shortest_path):
-                continue
+        while stack:
+            current = stack.pop()
 
-            if current in self.visited or current in self.obstacles:
+            if seen[current]:
                 continue
 
-            self.visited.add(current)
-            path = path + [current]
+            seen[current] = 1
+            expanded.append(current)
 
-            if current == food.position:
-                if not shortest_path or len(path) < len(shortest_path):
-                    shortest_path = path
-                continue
+            if current == goal:
+                self.chosen_path = grid.path(start, goal)
+                return
 
-            for direction in Direction:
-                dx, dy = direction.value
-                neighbor = Position(current.x + dx, current.y + dy)
+            if budget is not None and len(expanded) >= budget:
+                self.chosen_path = self.closest_path(start, goal, expanded)
+                return
 
-                if (
-                    0 <= neighbor.x < GRID_WIDTH
-                    and 0 <= neighbor.y < GRID_HEIGHT
-                    and neighbor not in self.visited
-                    and neighbor not in self.obstacles
-                ):
-                    stack.append((neighbor, path, cost + 1))
+            for offset in offsets:
+                neighbor = current + offset
+                if not seen[neighbor]:
+                    parents[neighbor] = current
+                    stack.append(neighbor)
 
         self.chosen_path = []
-        if shortest_path:
-            for i in range(len(shortest_path) - 1):
-                dx = shortest_path[i + 1].x - shortest_path[i].x
-                dy = shortest_path[i + 1].y - shortest_path[i].y
-                self.chosen_path.append(Direction((dx, dy)))
+
+    # Iterative deepening DFS
+    def iddfs_search(self, snake: Snake, food: Food, obstacles: Set[Obstacle]):
+        # Depth-limited DFS with the limit growing from the Manhattan distance to
+        # the food, so the first path found is a shortest one. Every iteration
+        # keeps the smallest depth each cell was reached at in distances and only
+        # expands a cell again when it is reached by a shorter route. The depth of
+        # a cell only goes down, so an iteration expands every cell at most
+        # limit + 1 times instead of once
+        grid = self.grid
+        depths, parents, blocked, offsets, expanded = (grid.distances, grid.parents, grid.blocked, grid.offsets,
+                                                       self.expanded)
+        budget = self.NODE_BUDGET
+
+        start = grid.index(snake.get_head_position())
+        goal = grid.index(food.position)
+        limit = self.heuristic(snake.get_head_position(), food.position)
+
+        while True:
+            depths[:] = grid.unreached
+            depths[start] = 0
+            stack = [start]
+            iteration_start = len(expanded)
+            # Whether the limit stopped the search anywhere, otherwise a deeper
+            # iteration would not reach any new cell
+            cut = False
+
+            while stack:
+                current = stack.pop()
+                expanded.append(current)
+
+                if current == goal:
+                    self.chosen_path = grid.path(start, goal)
+                    return
+
+                if budget is not None and len(expanded) >= budget:
+                    self.chosen_path = self.closest_path(start, goal, expanded[iteration_start:])
+                    return
+
+                depth = depths[current] + 1
+                if depth > limit:
+                    cut = True
+                    continue
+
+                for offset in offsets:
+                    neighbor = current + offset
+                    if depth < depths[neighbor] and not blocked[neighbor]:
+                        depths[neighbor] = depth
+                        parents[neighbor] = current
+                        stack.append(neighbor)
+
+            if not cut:
+                self.chosen_path = []
+                return
+            limit += 1
+
+    # Path to the cell among candidates closest to the goal, used when a search
+    # runs out of its node budget
+    def closest_path(self, start: int, goal: int, candidates: List[int]) -> List[Direction]:
+        grid = self.grid
+        return grid.path(start, min(candidates, key=lambda cell: grid.manhattan(cell, goal)))
 
     # Dijkstra Algorithm
     def dijkstra_search(self, snake: Snake, food: Food, obstacles: Set[Obstacle]):
-        distances = {Position(x, y): float('inf') for x in range(GRID_WIDTH) for y in range(GRID_HEIGHT)}
-        head = snake.get_head_position()
-        distances[head] = 0
-
-        priority_queue = [(0, head)]
-        backtrack = {}
+        # The heap holds (distance, cell) pairs. A cell can be pushed more than
+        # once, the outdated entries are skipped when popped (lazy deletion)
+        grid = self.grid
+        distances, parents, blocked, offsets, expanded = (grid.distances, grid.parents, grid.blocked, grid.offsets,
+                                                          self.expanded)
+        distances[:] = grid.unreached
+
+        start = grid.index(snake.get_head_position())
+        goal = grid.index(food.position)
+        distances[start] = 0
+        priority_queue = [(0, start)]
 
         while priority_queue:
-            priority_queue.sort(key=lambda x: x[0])
-            current_distance, current_position = priority_queue.pop(0)
+            current_distance, current = heappop(priority_queue)
 
-            if current_position in self.visited:
+            if current_distance > distances[current]:
                 continue
 
-            self.visited.add(current_position)
+            expanded.append(current)
 
-            if current_position == food.position:
+            if current == goal:
                 break
 
-            for direction in Direction:
-                dx, dy = direction.value
-                neighbor = Position(current_position.x + dx, current_position.y + dy)
-
-                if (
-                    0 <= neighbor.x < GRID_WIDTH
-                    and 0 <= neighbor.y < GRID_HEIGHT
-                    and neighbor not in self.visited
-                    and neighbor not in self.obstacles
-                ):
-                    new_distance = current_distance + 1
-
-                    if new_distance < distances[neighbor]:
-                        distances[neighbor] = new_distance
-                        backtrack[neighbor] = current_position
-                        priority_queue.append((new_distance, neighbor))
-
-        path = []
-        if food.position in backtrack:
-            current = food.position
-            while current != head:
-                previous = backtrack[current]
-                dx = current.x - previous.x
-                dy = current.y - previous.y
-                path.append(Direction((dx, dy)))
-                current = previous
-
-            path.reverse()
-
-        self.chosen_path = path
+            new_distance = current_distance + 1
+            for offset in offsets:
+                neighbor = current + offset
+                # Settled cells always have a distance <= new_distance
+                if new_distance < distances[neighbor] and not blocked[neighbor]:
+                    distances[neighbor] = new_distance
+                    parents[neighbor] = current
+                    heappush(priority_queue, (new_distance, neighbor))
+
+        self.chosen_path = grid.path(start, goal) if distances[goal] < INF else []
 
     # A* Algorithm
     def a_star_search(self, snake: Snake, food: Food, obstacles: Set[Obstacle]):
-        open_set = [(0, snake.get_head_position())]
-        g_score = {Position(x, y): float('inf') for x in range(GRID_WIDTH) for y in range(GRID_HEIGHT)}
-        g_score[snake.get_head_position()] = 0
-        f_score = {Position(x, y): float('inf') for x in range(GRID_WIDTH) for y in range(GRID_HEIGHT)}
-        f_score[snake.get_head_position()] = self.heuristic(snake.get_head_position(), food.position)
+        # Same arrays and lazy deletion as Dijkstra, g scores live in distances.
+        # The heap holds (f, -g, cell): among equal f scores the deepest node is
+        # expanded first, which avoids expanding the whole band of ties
+        grid = self.grid
+        g_score, parents, blocked, offsets, expanded = (grid.distances, grid.parents, grid.blocked, grid.offsets,
+                                                        self.expanded)
+        g_score[:] = grid.unreached
+        manhattan = grid.manhattan
 
-        came_from = {}
+        head = snake.get_head_position()
+        start = grid.index(head)
+        goal = grid.index(food.position)
+        g_score[start] = 0
+        open_set = [(self.heuristic(head, food.position), 0, start)]
 
         while open_set:
-            current = min(open_set, key=lambda x: x[0])[1] # we choose the one with lowest f score
-            open_set = [node for node in open_set if node[1] != current]
-
-            if current == food.position:
-                self.chosen_path = self.reconstruct_path(came_from, current)
-                return
-
-            self.visited.add(current)
+            _, negative_g, current = heappop(open_set)
 
-            for direction in Direction:
-                dx, dy = direction.value
-                neighbor = Position(current.x + dx, current.y + dy)
+            if -negative_g > g_score[current]:
+                continue
 
-                if (
-                    0 <= neighbor.x < GRID_WIDTH
-                    and 0 <= neighbor.y < GRID_HEIGHT
-                    and neighbor not in self.visited
-                    and neighbor not in self.obstacles
-                ):
-                    tentative_g_score = g_score[current] + 1
+            expanded.append(current)
 
-                    if tentative_g_score < g_score[neighbor]:
-                        came_from[neighbor] = current
-                        g_score[neighbor] = tentative_g_score
-                        f_score[neighbor] = tentative_g_score + self.heuristic(neighbor, food.position)
+            if current == goal:
+                self.chosen_path = grid.path(start, goal)
+                return
 
-                        if neighbor not in [node[1] for node in open_set]:
-                            open_set.append((f_score[neighbor], neighbor))
+            tentative_g_score = -negative_g + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if tentative_g_score < g_score[neighbor] and not blocked[neighbor]:
+                    g_score[neighbor] = tentative_g_score
+                    parents[neighbor] = current
+                    f_score = tentative_g_score + manhattan(neighbor, goal)
+                    heappush(open_set, (f_score, -tentative_g_score, neighbor))
 
         self.chosen_path = []
 
-    def heuristic(self, position: Position, goal: Position) -> float:
-        return sqrt((position.x - goal.x) ** 2 + (position.y - goal.y) ** 2)
+    # D* Lite Algorithm
+    def d_star_lite_search(self, snake: Snake, food: Food, obstacles: Set[Obstacle]):
+        # Incremental mode: the planner is kept between searches and only the next
+        # move is returned, so the game replans on every tick and every replan only
+        # repairs what changed since the last one (the head, the tail and cells
+        # freed or blocked by a reset). Eating moves the food and starts a new plan
+        grid = self.grid
+        start = grid.index(snake.get_head_position())
+        goal = grid.index(food.position)
+        blocked_cells = {grid.index(obstacle.position) for obstacle in obstacles}
+        blocked_cells.update(grid.index(segment) for segment in snake.positions[1:])
+
+        planner = self.planner
+        if planner is None or planner.grid is not grid or planner.goal != goal:
+            self.planner = planner = DStarLite(grid, start, goal)
+        else:
+            planner.move(start, blocked_cells ^ self.blocked_cells)
+        self.blocked_cells = blocked_cells
 
-    def reconstruct_path(self, came_from: dict, current: Position):
-        path = []
-        while current in came_from:
-            previous = came_from[current]
-            dx = current.x - previous.x
-            dy = current.y - previous.y
-            path.append(Direction((dx, dy)))
-            current = previous
-        path.reverse()
-        return path
+        planner.compute(self.expanded)
+        step = planner.next_step()
+        self.chosen_path = [step] if step is not None else []
 
+    # Manhattan distance, the exact cost on an empty 4-connected grid, so it never
+    # overestimates and A* still finds shortest paths
+    def heuristic(self, position: Position, goal: Position) -> int:
+        return abs(position.x - goal.x) + abs(position.y - goal.y)
 
 
 if __name__ == "__main__":
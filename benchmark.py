@@ -0,0 +1,250 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+for task in ('Task 1', 'Task 2', 'Task 3'):
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), task))
+from mixture import sample_mixture
+from dataset import split_classes
+from neuron import Neuron
+from neural_network import SimpleNeuralNet, one_hot
+
+
+# Benchmarks of the Task 1 generator, the Task 2 neuron and the Task 3 network
+# over a grid of dataset sizes and architectures. Every case is run with a fixed
+# seed and records its throughput (best of --repeat runs of at least --min-time
+# seconds), peak memory (numpy and Python allocations, measured by tracemalloc
+# in a separate run) and final accuracy. With a baseline file the run fails
+# when a case got slower, uses more memory or is less accurate than the
+# baseline allows.
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+
+def make_data(n_samples, seed):
+    # Task 3 data: two modes per class, means in [-1, 1] and A @ A.T covariances
+    return sample_mixture(2, max(n_samples // 4, 1), mean_range=(-1, 1), variance_range=(0.1, 0.5),
+                          full_covariance=True, seed=seed)
+
+
+def generator_case(n_samples, args):
+    def run():
+        X, _ = make_data(n_samples, args.seed)
+        return len(X), None
+    return run
+
+
+def neuron_case(n_samples, activation, args):
+    X, y = make_data(n_samples, args.seed)
+    data0, data1 = split_classes(X, y)
+
+    def run():
+        neuron = Neuron(learning_rate=0.01, epochs=args.epochs, activation=activation, batch_size=32, shuffle=True,
+                        seed=args.seed)
+        neuron.training(data0, data1)
+        return len(X) * neuron.epochs_run, neuron.accuracy(X, y)
+    return run
+
+
+def network(layers, neurons, activation, args):
+    np.random.seed(args.seed)
+    return SimpleNeuralNet(2, neurons, layers, activation, lr=0.01, iterations=args.iterations,
+                           batch_size=32, shuffle=True, seed=args.seed, optimizer='adam')
+
+
+def train_case(n_samples, layers, neurons, activation, args):
+    X, y = make_data(n_samples, args.seed)
+
+    def run():
+        model = network(layers, neurons, activation, args)
+        model.train(X, y)
+        return len(X) * model.epochs_run, model.evaluate(X, y)[1]
+    return run
+
+
+def predict_case(n_samples, layers, neurons, activation, args):
+    X, y = make_data(n_samples, args.seed)
+    model = network(layers, neurons, activation, args)
+    model.train(X, y)
+
+    def run():
+        labels = model.predict_batch(X)
+        return len(X), float(np.mean(labels == y))
+    return run
+
+
+def step_allocations(layers, neurons, activation, fused, args, batch_size=512, steps=20):
+    """
+    Memory allocated by training steps on a preallocated batch, after warm-up.
+    Returns (peak, arrays, smallest): the peak of the traced memory over the
+    steps, the bytes of numpy arrays still allocated after them and the size of
+    the smallest layer buffer. A step that allocates a batch-sized array peaks
+    above smallest, the rest is Python bookkeeping of a few hundred bytes.
+    """
+    np.random.seed(args.seed)
+    model = SimpleNeuralNet(2, neurons, layers, activation, lr=0.01, batch_size=batch_size, seed=args.seed,
+                            optimizer='adam', fused=fused)
+    X, y = make_data(batch_size, args.seed)
+    model.allocate_workspace(batch_size)
+    workspace = model.workspaces[batch_size]
+    x, t = workspace['x'], workspace['y']
+    x[...] = X.T
+    t[...] = one_hot(y, dtype=model.dtype)
+    for _ in range(3):
+        model.backward_propagation(x, t)
+
+    arrays = tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces([arrays])
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(steps):
+            model.backward_propagation(x, t)
+        peak = tracemalloc.get_traced_memory()[1] - base
+        after = tracemalloc.take_snapshot().filter_traces([arrays])
+    finally:
+        tracemalloc.stop()
+    left = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    smallest = min(array.nbytes for layer in model.layers for array in layer.workspaces[batch_size])
+    return peak, left, smallest
+
+
+def cases(args):
+    # (name, parameters, setup) for every benchmark, setup returns the timed function
+    for n in args.samples:
+        yield 'generator', {'samples': n}, lambda n=n: generator_case(n, args)
+    for n, activation in itertools.product(args.samples, args.activations):
+        yield 'neuron_train', {'samples': n, 'activation': activation}, \
+            lambda n=n, a=activation: neuron_case(n, a, args)
+    for n, layers, neurons, activation in itertools.product(args.samples, args.layers, args.neurons,
+                                                            args.activations):
+        params = {'samples': n, 'layers': layers, 'neurons': neurons, 'activation': activation}
+        yield 'network_train', params, lambda p=params: train_case(*p.values(), args)
+        yield 'network_predict', params, lambda p=params: predict_case(*p.values(), args)
+
+
+def measure(run, repeat, min_time):
+    # Every timed run calls run until min_time has passed, so fast cases are not
+    # dominated by timer noise
+    best = 0.0
+    for _ in range(repeat):
+        samples, elapsed = 0, 0.0
+        while elapsed < min_time or samples == 0:
+            start = time.perf_counter()
+            n, accuracy = run()
+            elapsed += time.perf_counter() - start
+            samples += n
+        best = max(best, samples / elapsed)
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'samples_per_sec': best, 'peak_memory': peak, 'accuracy': accuracy}
+
+
+def case_key(name, params):
+    return name + ' ' + ' '.join(f"{key}={value}" for key, value in params.items())
+
+
+def compare(results, baseline, args):
+    # Returns a message for every case that regressed against the baseline
+    failures = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if result['samples_per_sec'] < reference['samples_per_sec'] * (1 - args.speed_tolerance):
+            failures.append(f"{key}: {result['samples_per_sec']:,.0f} samples/s, "
+                            f"baseline {reference['samples_per_sec']:,.0f}")
+        if result['peak_memory'] > reference['peak_memory'] * (1 + args.memory_tolerance):
+            failures.append(f"{key}: peak memory {result['peak_memory']:,} B, baseline {reference['peak_memory']:,} B")
+        if result['accuracy'] is not None and reference['accuracy'] is not None and \
+                result['accuracy'] < reference['accuracy'] - args.accuracy_tolerance:
+            failures.append(f"{key}: accuracy {result['accuracy']:.4f}, baseline {reference['accuracy']:.4f}")
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the Task 1-3 generator and learners.')
+    parser.add_argument('--samples', type=int, nargs='+', default=[1000, 10000], help='dataset sizes')
+    parser.add_argument('--layers', type=int, nargs='+', default=[1, 2], help='hidden layers')
+    parser.add_argument('--neurons', type=int, nargs='+', default=[8, 32], help='neurons per hidden layer')
+    parser.add_argument('--activations', nargs='+', default=['sigmoid', 'relu'])
+    parser.add_argument('--iterations', type=int, default=5, help='training iterations of the network')
+    parser.add_argument('--epochs', type=int, default=20, help='training epochs of the neuron')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case, the best one is kept')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum duration of a timed run in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json', help='results file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline to compare against (if it exists)')
+    parser.add_argument('--update-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--require-baseline', action='store_true',
+                        help='fail when the baseline does not exist instead of only warning (for CI)')
+    parser.add_argument('--speed-tolerance', type=float, default=0.2, help='allowed relative throughput loss')
+    parser.add_argument('--memory-tolerance', type=float, default=0.2, help='allowed relative peak memory growth')
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.01, help='allowed accuracy loss')
+    args = parser.parse_args()
+    if args.require_baseline and not args.update_baseline and not os.path.exists(args.baseline):
+        parser.error(f"the baseline {args.baseline} does not exist, store one with --update-baseline")
+
+    results = {}
+    print(f"{'case':<70} {'samples/s':>13} {'peak memory':>13} {'accuracy':>9}")
+    for name, params, setup in cases(args):
+        key = case_key(name, params)
+        results[key] = dict(name=name, params=params, **measure(setup(), args.repeat, args.min_time))
+        result = results[key]
+        accuracy = '' if result['accuracy'] is None else f"{result['accuracy']:.4f}"
+        print(f"{key:<70} {result['samples_per_sec']:>13,.0f} {result['peak_memory']:>13,} {accuracy:>9}")
+
+    # Steady-state training must not allocate: every array of a step lives in
+    # the workspaces of the layers and the network
+    allocations, failures = {}, []
+    for layers, neurons, activation, fused in itertools.product(args.layers, args.neurons, args.activations,
+                                                                (False, True)):
+        key = f"step_allocations layers={layers} neurons={neurons} activation={activation} fused={fused}"
+        peak, left, smallest = step_allocations(layers, neurons, activation, fused, args)
+        allocations[key] = {'peak_memory': peak, 'array_bytes_left': left}
+        print(f"{key:<70} {'':>13} {peak:>13,}")
+        if left != 0 or peak >= smallest:
+            failures.append(f"{key}: training steps allocate memory (peak {peak:,} B, {left:,} B of arrays left, "
+                            f"smallest buffer {smallest:,} B)")
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'seed': args.seed,
+        'results': results,
+        'step_allocations': allocations,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Stored the results as the baseline {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            failures += compare(results, json.load(f)['results'], args)
+        if not failures:
+            print(f"No regressions against {args.baseline}")
+    else:
+        print(f"WARNING: no baseline at {args.baseline}, the results were not compared. Store one with "
+              f"--update-baseline, --require-baseline makes a missing baseline fail the run.", file=sys.stderr)
+
+    if failures:
+        print(f"{len(failures)} regressions:")
+        print('\n'.join(failures))
+        sys.exit(1)